@@ -1,11 +1,70 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
+    github_api_url: str = "https://api.github.com"
+    github_web_url: str = "https://github.com"
     github_token: str = ""
+    github_tokens: str = ""
+    github_token_max_wait: int = 60
+    github_graphql_enabled: bool = False
+    github_graphql_batch_window: float = 0.01
+    github_graphql_max_batch: int = 25
+    github_etag_ttl: int = 86400
+    github_etag_max_entries: int = 5000
+    github_etag_max_bytes: int = 32 * 1024 * 1024
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0
+    http2_enabled: bool = True
+    github_api_connect_timeout: float = 5.0
+    github_api_read_timeout: float = 15.0
+    github_api_pool_timeout: float = 5.0
+    github_web_connect_timeout: float = 5.0
+    github_web_read_timeout: float = 20.0
+    github_web_pool_timeout: float = 5.0
+    scraper_parser: Literal["lxml", "bs4"] = "lxml"
+    scraper_executor: Literal["thread", "process", "inline"] = "thread"
+    scraper_workers: int = 4
+    scraper_max_queue: int = 32
+    scraper_max_bytes: int = 2 * 1024 * 1024
     rapidapi_proxy_secret: str = ""
+    cache_backend: Literal["memory", "redis", "tiered"] = "memory"
+    redis_url: str = "redis://localhost:6379/0"
+    cache_l1_ttl: int = 10
+    cache_l1_max_entries: int = 1000
     cache_ttl: int = 300
+    cache_stale_ttl: int = 300
+    cache_refresh_ahead_top_n: int = 0
+    cache_refresh_ahead_interval: int = 30
+    cache_max_entries: int = 10000
+    cache_max_bytes: int = 64 * 1024 * 1024
+    cache_sweep_interval: int = 60
+    cache_snapshot_path: str = ""
+    cache_snapshot_interval: int = 60
+    cache_not_found_ttl: int = 60
+    cache_degraded_ttl: int = 30
+    circuit_failure_threshold: int = 5
+    circuit_reset_timeout: float = 5.0
+    circuit_max_reset_timeout: float = 120.0
+    response_compress_min_bytes: int = 1024
+    response_gzip_level: int = 6
+    response_brotli_quality: int = 5
     rate_limit: str = "30/minute"
+    rate_limit_plans: str = ""
+    rate_limit_storage_uri: str = "memory://"
+    rate_limit_strategy: Literal["sliding-window-counter", "moving-window", "fixed-window"] = "sliding-window-counter"
+    repos_fetch_concurrency: int = 4
+    repos_fetch_max_pages: int = 50
+    batch_max_usernames: int = 50
+    batch_concurrency: int = 8
+    admin_token: str = ""
+    prefetch_workers: int = 2
+    prefetch_db_path: str = ""
+    prefetch_budget_share: float = 0.5
+    prefetch_max_attempts: int = 5
 
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
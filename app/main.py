@@ -1,28 +1,97 @@
+import asyncio
 from contextlib import asynccontextmanager
+from functools import partial
 
-import httpx
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from slowapi import _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
 
 from app.config import settings
+from app.middleware.metrics import MetricsMiddleware
 from app.middleware.rapidapi import RapidAPIMiddleware
-from app.middleware.rate_limit import limiter
-from app.routers import profile, repositories
-from app.services.cache import TTLCache
+from app.middleware.rate_limit import RateLimitMiddleware, limiter
+from app.routers import admin, metrics, profile, repositories
+from app.services.cache_backends import SnapshotCacheBackend, build_cache_backend
+from app.services.circuit_breaker import build_circuit_breaker
 from app.services.github_api import GitHubAPIClient
+from app.services.github_graphql import GitHubGraphQLClient
 from app.services.github_scraper import GitHubScraper
+from app.services.http import build_http_clients
+from app.services.loader import CacheLoader
+from app.services.metrics import TimedJSONResponse
+from app.services.parse_executor import ParseExecutor
+from app.services.prefetch import build_prefetch_queue
+from app.services.singleflight import SingleFlight
+from app.services.token_pool import build_token_pool
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    app.state.http_client = httpx.AsyncClient(timeout=30.0)
-    app.state.github_api = GitHubAPIClient(app.state.http_client)
-    app.state.github_scraper = GitHubScraper(app.state.http_client)
-    app.state.cache = TTLCache(default_ttl=settings.cache_ttl)
+    app.state.api_http_client, app.state.web_http_client = build_http_clients(settings)
+    app.state.token_pool = build_token_pool(settings)
+    api_breaker = build_circuit_breaker(settings)
+    app.state.github_api = GitHubAPIClient(
+        app.state.api_http_client,
+        token_pool=app.state.token_pool,
+        breaker=api_breaker,
+    )
+    app.state.parse_executor = ParseExecutor(
+        settings.scraper_executor,
+        settings.scraper_parser,
+        max_workers=settings.scraper_workers,
+        max_queue=settings.scraper_max_queue,
+    )
+    app.state.github_scraper = GitHubScraper(
+        app.state.web_http_client,
+        app.state.parse_executor,
+        breaker=build_circuit_breaker(settings),
+    )
+    app.state.github_graphql = None
+    if settings.github_graphql_enabled and (settings.github_token or settings.github_tokens):
+        app.state.github_graphql = GitHubGraphQLClient(
+            app.state.api_http_client,
+            build_token_pool(settings),
+            batch_window=settings.github_graphql_batch_window,
+            max_batch=settings.github_graphql_max_batch,
+            breaker=api_breaker,
+        )
+    app.state.cache = build_cache_backend(settings)
+    app.state.singleflight = SingleFlight()
+    app.state.loader = CacheLoader(
+        app.state.cache,
+        app.state.singleflight,
+        hot_keys=settings.cache_refresh_ahead_top_n,
+        not_found_ttl=settings.cache_not_found_ttl,
+    )
+    app.state.prefetch = None
+    if settings.prefetch_workers:
+        app.state.prefetch = build_prefetch_queue(
+            settings,
+            app.state.loader,
+            app.state.token_pool,
+            {
+                "profile": partial(profile.prefetch_profile, app.state),
+                "repos": partial(repositories.prefetch_repositories, app.state),
+            },
+        )
+        app.state.prefetch.start()
+    background_tasks = []
+    if settings.cache_refresh_ahead_top_n:
+        background_tasks.append(
+            asyncio.create_task(app.state.loader.run_refresh_ahead(settings.cache_refresh_ahead_interval))
+        )
+    if isinstance(app.state.cache, SnapshotCacheBackend):
+        background_tasks.append(
+            asyncio.create_task(app.state.cache.run_snapshots(settings.cache_snapshot_interval))
+        )
     yield
-    await app.state.http_client.aclose()
+    for task in background_tasks:
+        task.cancel()
+    if app.state.prefetch is not None:
+        await app.state.prefetch.close()
+    await app.state.cache.close()
+    app.state.parse_executor.shutdown()
+    await app.state.api_http_client.aclose()
+    await app.state.web_http_client.aclose()
 
 
 tags_metadata = [
@@ -50,6 +119,7 @@ app = FastAPI(
         "- **Contribution stats**: Total contributions in the last year\n"
         "- **Achievement badges**: List of GitHub achievement badges\n"
         "- **Repositories**: Paginated, sortable list of public repos with full metadata\n"
+        "- **Batch profiles**: Fetch up to 50 profiles in one request with per-user status\n"
         "- **Caching**: 5-minute TTL cache for fast responses\n\n"
         "## How it works\n"
         "Hybrid approach combining GitHub REST API (structured data) with HTML scraping "
@@ -58,21 +128,25 @@ app = FastAPI(
     version="1.0.0",
     lifespan=lifespan,
     openapi_tags=tags_metadata,
+    default_response_class=TimedJSONResponse,
 )
 
 app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
-    allow_methods=["GET"],
+    allow_methods=["GET", "POST"],
     allow_headers=["*"],
 )
+app.add_middleware(RateLimitMiddleware)
 app.add_middleware(RapidAPIMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(profile.router, tags=["Profile"])
 app.include_router(repositories.router, tags=["Repositories"])
+app.include_router(metrics.router)
+app.include_router(admin.router)
 
 
 @app.get(
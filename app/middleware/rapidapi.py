@@ -1,16 +1,36 @@
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+import hmac
+
+from fastapi import Response
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from app.config import settings
 
+SECRET_HEADER = b"x-rapidapi-proxy-secret"
+
+
+class RapidAPIMiddleware:
+    """Reject requests that do not carry the RapidAPI proxy secret.
+
+    Plain ASGI: the check runs on the raw scope headers before the body is read,
+    and accepted requests are passed through untouched, so streaming responses work.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-class RapidAPIMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next) -> Response:
-        if not settings.rapidapi_proxy_secret:
-            return await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        secret = settings.rapidapi_proxy_secret
+        if scope["type"] != "http" or not secret:
+            await self.app(scope, receive, send)
+            return
 
-        proxy_secret = request.headers.get("X-RapidAPI-Proxy-Secret", "")
-        if proxy_secret != settings.rapidapi_proxy_secret:
-            return Response(content="Unauthorized", status_code=403)
+        proxy_secret = b""
+        for name, value in scope["headers"]:
+            if name == SECRET_HEADER:
+                proxy_secret = value
+                break
+        if not hmac.compare_digest(proxy_secret, secret.encode()):
+            await Response(content="Unauthorized", status_code=403)(scope, receive, send)
+            return
 
-        return await call_next(request)
+        await self.app(scope, receive, send)
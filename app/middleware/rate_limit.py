@@ -1,9 +1,123 @@
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+import math
+import time
+
+from fastapi.responses import JSONResponse
+from limits import parse
+from limits.aio.strategies import STRATEGIES
+from limits.storage import storage_from_string
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from app.config import settings
 
-limiter = Limiter(
-    key_func=get_remote_address,
-    default_limits=[settings.rate_limit],
+USER_HEADER = b"x-rapidapi-user"
+PLAN_HEADER = b"x-rapidapi-subscription"
+EXEMPT_PATHS = {"/health", "/metrics"}
+
+
+class RateLimiter:
+    """Per-client request limits kept in a shared store.
+
+    ``storage_uri`` is a ``limits`` storage URI: ``memory://`` for one worker or
+    ``redis://...`` so all workers share one set of counters. The strategies
+    update Redis with a single atomic script per hit. ``plans`` maps a RapidAPI
+    subscription name to its limit; other clients get ``default``.
+    """
+
+    def __init__(
+        self,
+        default: str,
+        plans: dict[str, str],
+        storage_uri: str = "memory://",
+        strategy: str = "sliding-window-counter",
+    ):
+        if not storage_uri.startswith("async+"):
+            storage_uri = "async+" + storage_uri
+        options = {"implementation": "redispy"} if storage_uri.startswith("async+redis") else {}
+        self._storage = storage_from_string(storage_uri, **options)
+        self._strategy = STRATEGIES[strategy](self._storage)
+        self._default = parse(default)
+        self._plans = {plan.upper(): parse(limit) for plan, limit in plans.items()}
+        self.allowed = 0
+        self.rejected = 0
+        self.errors = 0
+
+    def limit_for(self, plan: str | None):
+        return self._plans.get(plan.upper(), self._default) if plan else self._default
+
+    async def hit(self, key: str, plan: str | None = None) -> float | None:
+        """Count one request; None if it is allowed, else seconds until it would be."""
+        limit = self.limit_for(plan)
+        try:
+            if await self._strategy.hit(limit, key):
+                self.allowed += 1
+                return None
+            stats = await self._strategy.get_window_stats(limit, key)
+        except Exception:
+            # An unreachable store must not take the API down with it.
+            self.errors += 1
+            return None
+        self.rejected += 1
+        return max(stats.reset_time - time.time(), 0.0)
+
+    def stats(self) -> dict[str, int]:
+        return {"allowed": self.allowed, "rejected": self.rejected, "errors": self.errors}
+
+
+def _parse_plans(value: str) -> dict[str, str]:
+    plans = {}
+    for item in value.split(","):
+        plan, _, limit = item.partition("=")
+        if plan.strip() and limit.strip():
+            plans[plan.strip()] = limit.strip()
+    return plans
+
+
+limiter = RateLimiter(
+    settings.rate_limit,
+    _parse_plans(settings.rate_limit_plans),
+    storage_uri=settings.rate_limit_storage_uri,
+    strategy=settings.rate_limit_strategy,
 )
+
+
+class RateLimitMiddleware:
+    """Apply ``app.state.limiter`` before routing.
+
+    Clients are keyed by the RapidAPI user header when requests are known to come
+    through the RapidAPI proxy (a proxy secret is configured), otherwise by
+    client address, which behind the proxy would be one bucket for everyone.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        user = plan = None
+        if settings.rapidapi_proxy_secret:
+            for name, value in scope["headers"]:
+                if name == USER_HEADER:
+                    user = value.decode("latin-1")
+                elif name == PLAN_HEADER:
+                    plan = value.decode("latin-1")
+        if user:
+            key = f"user:{user}"
+        else:
+            client = scope.get("client")
+            key = f"ip:{client[0] if client else 'unknown'}"
+
+        limiter: RateLimiter = scope["app"].state.limiter
+        retry_after = await limiter.hit(key, plan)
+        if retry_after is None:
+            await self.app(scope, receive, send)
+            return
+
+        response = JSONResponse(
+            {"error": f"Rate limit exceeded: {limiter.limit_for(plan)}"},
+            status_code=429,
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+        await response(scope, receive, send)
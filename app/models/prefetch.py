@@ -0,0 +1,35 @@
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+from app.models.profile import GitHubLogin
+
+
+class PrefetchRequest(BaseModel):
+    usernames: list[GitHubLogin] = Field(
+        ...,
+        min_length=1,
+        max_length=10000,
+        description="GitHub usernames to prefetch (duplicates are ignored)",
+        examples=[["torvalds", "octocat"]],
+    )
+    kinds: list[Literal["profile", "repos"]] = Field(
+        ["profile", "repos"],
+        min_length=1,
+        description="What to cache for each user: the profile, the full repository list, or both",
+    )
+    priority: int = Field(5, ge=0, le=9, description="Jobs with a lower number run first", examples=[5])
+    interval: int = Field(
+        0,
+        ge=0,
+        description="Fetch again every this many seconds to keep the cache warm; 0 fetches once",
+        examples=[240],
+    )
+
+
+class PrefetchQueued(BaseModel):
+    queued: int = Field(..., description="Number of jobs queued (one per user and kind)", examples=[4])
+
+
+class PrefetchRemoved(BaseModel):
+    removed: int = Field(..., description="Number of queued jobs removed", examples=[2])
@@ -1,4 +1,12 @@
-from pydantic import BaseModel, Field
+from typing import Annotated
+
+from pydantic import BaseModel, Field, StringConstraints
+
+from app.config import settings
+
+# A GitHub login: letters, digits and hyphens, not starting with a hyphen. Request
+# bodies are checked against it because usernames become part of upstream URLs.
+GitHubLogin = Annotated[str, StringConstraints(pattern=r"^[A-Za-z0-9](?:[A-Za-z0-9-]{0,38})$")]
 
 
 class PinnedRepo(BaseModel):
@@ -48,3 +56,24 @@ class GitHubProfile(BaseModel):
     pinned_repos: list[PinnedRepo] = Field([], description="Pinned repositories (scraped from profile page)")
     contribution_stats: ContributionStats | None = Field(None, description="Contribution statistics for the last year")
     achievements: list[str] = Field([], description="GitHub achievement badges", examples=[["Arctic Code Vault Contributor", "Pull Shark"]])
+
+
+class ProfilesBatchRequest(BaseModel):
+    usernames: list[GitHubLogin] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.batch_max_usernames,
+        description="GitHub usernames to fetch (duplicates are ignored)",
+        examples=[["torvalds", "octocat"]],
+    )
+
+
+class ProfileBatchResult(BaseModel):
+    username: str = Field(..., description="Requested GitHub username", examples=["torvalds"])
+    status: int = Field(..., description="HTTP status for this user (200, 404, 429, 502)", examples=[200])
+    profile: GitHubProfile | None = Field(None, description="Profile, when status is 200")
+    error: str | None = Field(None, description="Error detail, when status is not 200")
+
+
+class ProfilesBatchResponse(BaseModel):
+    results: list[ProfileBatchResult] = Field(..., description="One result per requested username, in request order")
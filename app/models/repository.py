@@ -25,3 +25,26 @@ class RepositoriesResponse(BaseModel):
     page: int = Field(..., description="Current page number", examples=[1])
     per_page: int = Field(..., description="Items per page", examples=[30])
     repositories: list[GitHubRepository] = Field(..., description="List of repositories")
+
+
+class LanguageStats(BaseModel):
+    language: str | None = Field(None, description="Primary language (null for repositories without one)", examples=["C"])
+    repositories: int = Field(..., description="Number of repositories", examples=[3])
+    stars: int = Field(..., description="Total stars across these repositories", examples=[186000])
+    forks: int = Field(..., description="Total forks across these repositories", examples=[56000])
+
+
+class TopicStats(BaseModel):
+    topic: str = Field(..., description="Repository topic", examples=["kernel"])
+    repositories: int = Field(..., description="Number of repositories with this topic", examples=[2])
+
+
+class RepositoryStats(BaseModel):
+    username: str = Field(..., description="GitHub username", examples=["torvalds"])
+    total_repositories: int = Field(..., description="Number of public repositories", examples=[7])
+    total_stars: int = Field(..., description="Stars across all repositories", examples=[190000])
+    total_forks: int = Field(..., description="Forks across all repositories", examples=[57000])
+    forked_repositories: int = Field(..., description="Repositories that are forks", examples=[1])
+    archived_repositories: int = Field(..., description="Archived repositories", examples=[0])
+    languages: list[LanguageStats] = Field(..., description="Per-language totals, most starred first")
+    topics: list[TopicStats] = Field(..., description="Most common topics (top 20)")
@@ -0,0 +1,38 @@
+import hmac
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+
+from app.config import settings
+from app.models.prefetch import PrefetchQueued, PrefetchRemoved, PrefetchRequest
+from app.services.prefetch import PrefetchQueue
+
+
+def require_admin_token(x_admin_token: str = Header("")) -> None:
+    if not settings.admin_token or not hmac.compare_digest(x_admin_token.encode(), settings.admin_token.encode()):
+        raise HTTPException(status_code=403, detail="Unauthorized")
+
+
+router = APIRouter(prefix="/admin", include_in_schema=False, dependencies=[Depends(require_admin_token)])
+
+
+def _prefetch_queue(request: Request) -> PrefetchQueue:
+    queue: PrefetchQueue | None = request.app.state.prefetch
+    if queue is None:
+        raise HTTPException(status_code=503, detail="Prefetch queue is disabled")
+    return queue
+
+
+@router.post("/prefetch", response_model=PrefetchQueued, status_code=202)
+async def enqueue_prefetch(body: PrefetchRequest, request: Request):
+    queued = await _prefetch_queue(request).enqueue(body.usernames, body.kinds, body.priority, body.interval)
+    return PrefetchQueued(queued=queued)
+
+
+@router.get("/prefetch")
+async def get_prefetch_stats(request: Request):
+    return _prefetch_queue(request).stats()
+
+
+@router.delete("/prefetch/{username}", response_model=PrefetchRemoved)
+async def remove_prefetch(username: str, request: Request):
+    return PrefetchRemoved(removed=await _prefetch_queue(request).remove(username))
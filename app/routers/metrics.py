@@ -0,0 +1,73 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+
+from app.services.http import pool_stats
+from app.services.metrics import metrics
+
+router = APIRouter()
+
+# stats() keys that are point-in-time values; every other key is a running count.
+GAUGE_STATS = {
+    "entries",
+    "bytes",
+    "in_flight",
+    "validators",
+    "connections",
+    "idle",
+    "in_use",
+    "queued",
+    "max_connections",
+    "limit",
+    "remaining",
+    "reset_in",
+    "open",
+    "open_for",
+    "pending",
+    "running",
+    "budget_rate",
+}
+
+
+def _samples(prefix: str, stats: dict, labels: dict[str, str] | None = None) -> list[tuple[str, dict[str, str], float]]:
+    samples = []
+    for key, value in stats.items():
+        if not isinstance(value, (int, float)):
+            continue
+        sample_labels = dict(labels or {})
+        # Tiered cache stats come as l1_hits, l2_hits, ...
+        if key[:3] in ("l1_", "l2_"):
+            sample_labels["tier"] = key[:2]
+            key = key[3:]
+        name = f"{prefix}_{key}" if key in GAUGE_STATS else f"{prefix}_{key}_total"
+        samples.append((name, sample_labels, value))
+    return samples
+
+
+def collect(state) -> list[tuple[str, dict[str, str], float]]:
+    samples = _samples("ghp_cache", state.cache.stats())
+    samples += _samples("ghp_rate_limit", state.limiter.stats())
+    samples += _samples("ghp_singleflight", state.singleflight.stats())
+    samples += _samples("ghp_loader", state.loader.stats())
+    samples += _samples("ghp_github_api", state.github_api.stats())
+    for token in state.github_api.token_stats():
+        samples += _samples("ghp_github_ratelimit", token, {"token": token["token"]})
+    samples += _samples("ghp_scraper", state.github_scraper.stats())
+    if getattr(state, "parse_executor", None) is not None:
+        samples += _samples("ghp_parse", state.parse_executor.stats())
+    if state.github_graphql is not None:
+        samples += _samples("ghp_github_graphql", state.github_graphql.stats())
+    for upstream, breaker in (("api", state.github_api.breaker), ("web", state.github_scraper.breaker)):
+        samples += _samples("ghp_circuit", breaker.stats(), {"upstream": upstream})
+    if state.prefetch is not None:
+        samples += _samples("ghp_prefetch", state.prefetch.stats())
+    for pool in ("api", "web"):
+        samples += _samples("ghp_http_pool", pool_stats(getattr(state, f"{pool}_http_client")), {"pool": pool})
+    return samples
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics(request: Request):
+    return PlainTextResponse(
+        metrics.render(collect(request.app.state)),
+        media_type="text/plain; version=0.0.4",
+    )
@@ -1,11 +1,19 @@
 import asyncio
 
-from fastapi import APIRouter, Request
+import orjson
+from fastapi import APIRouter, HTTPException, Request
 
-from app.models.profile import GitHubProfile
-from app.services.cache import TTLCache
+from app.config import settings
+from app.models.profile import GitHubProfile, ProfilesBatchRequest, ProfilesBatchResponse
+from app.services.cache_backends import CacheBackend
 from app.services.github_api import GitHubAPIClient
+from app.services.github_graphql import GitHubGraphQLClient
 from app.services.github_scraper import GitHubScraper
+from app.services.loader import CacheLoader, Expiring, Fetcher
+from app.services.metrics import TimedJSONResponse, metrics
+from app.services.ndjson import NDJSON_RESPONSE_DOC, ndjson_response, wants_ndjson
+from app.services.rendered import RenderedResponse
+from app.services.token_pool import TokenPool
 
 router = APIRouter()
 
@@ -18,49 +26,163 @@ router = APIRouter()
         "Retrieve a comprehensive GitHub user profile by username. "
         "Combines data from the GitHub REST API (basic info, stats) with "
         "HTML scraping (pinned repos, contribution graph, achievement badges). "
-        "Results are cached for 5 minutes."
+        "Results are cached for 5 minutes. If github.com pages cannot be fetched, the profile "
+        "is returned with REST API data only and cached for a shorter time."
     ),
     responses={
         200: {"description": "User profile retrieved successfully"},
         404: {"description": "GitHub user not found"},
         429: {"description": "Rate limit exceeded (GitHub API or local rate limit)"},
         502: {"description": "GitHub API upstream error"},
+        503: {"description": "GitHub API temporarily unavailable"},
     },
 )
 async def get_profile(username: str, request: Request):
-    cache: TTLCache = request.app.state.cache
-    api_client: GitHubAPIClient = request.app.state.github_api
-    scraper: GitHubScraper = request.app.state.github_scraper
-
-    cached = cache.get(f"profile:{username}")
-    if cached:
-        return cached
-
-    api_data, scraped_data = await asyncio.gather(
-        api_client.get_user(username),
-        scraper.scrape_profile(username),
-    )
-
-    profile = GitHubProfile(
-        username=api_data["login"],
-        name=api_data.get("name"),
-        bio=api_data.get("bio"),
-        avatar_url=api_data.get("avatar_url"),
-        location=api_data.get("location"),
-        company=api_data.get("company"),
-        blog=api_data.get("blog") or None,
-        twitter_username=api_data.get("twitter_username"),
-        email=api_data.get("email"),
-        public_repos=api_data.get("public_repos", 0),
-        public_gists=api_data.get("public_gists", 0),
-        followers=api_data.get("followers", 0),
-        following=api_data.get("following", 0),
-        created_at=api_data.get("created_at"),
-        updated_at=api_data.get("updated_at"),
-        pinned_repos=scraped_data.get("pinned_repos", []),
-        contribution_stats=scraped_data.get("contribution_stats"),
-        achievements=scraped_data.get("achievements", []),
-    )
-
-    cache.set(f"profile:{username}", profile)
-    return profile
+    rendered = await _load_profile(request, username)
+    # The entry's own TTL, which is shorter for degraded profiles.
+    cache: CacheBackend = request.app.state.cache
+    return rendered.response(request, await cache.ttl_remaining(f"profile:{username}"))
+
+
+@router.post(
+    "/profiles",
+    response_model=ProfilesBatchResponse,
+    summary="Get several GitHub user profiles",
+    description=(
+        f"Retrieve up to {settings.batch_max_usernames} profiles in one call. Cached profiles are returned immediately; "
+        "the rest are fetched concurrently, with concurrency limited by the remaining GitHub "
+        "API budget. Each result carries its own status, so one missing user does not fail the batch. "
+        "Send `Accept: application/x-ndjson` to receive one result per line as soon as it is ready."
+    ),
+    responses={
+        200: {"description": "Batch processed; see the per-user status", "content": NDJSON_RESPONSE_DOC},
+        422: {"description": "Too many or no usernames, or one that is not a valid GitHub login"},
+    },
+)
+async def get_profiles(batch: ProfilesBatchRequest, request: Request):
+    usernames = list(dict.fromkeys(batch.usernames))
+
+    token_pool: TokenPool = request.app.state.token_pool
+    concurrency = max(1, min(settings.batch_concurrency, token_pool.remaining()))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    # Results are built as plain dicts in ProfileBatchResult's shape, reusing the
+    # cached profile JSON, so no profile model is rebuilt or validated again.
+    async def load(username: str) -> dict:
+        try:
+            profile = orjson.loads((await _load_profile(request, username, semaphore)).body)
+        except HTTPException as exc:
+            return {"username": username, "status": exc.status_code, "profile": None, "error": exc.detail}
+        except Exception:
+            return {"username": username, "status": 502, "profile": None, "error": "GitHub upstream error"}
+        return {"username": username, "status": 200, "profile": profile, "error": None}
+
+    if wants_ndjson(request):
+
+        async def completed():
+            for result in asyncio.as_completed([load(username) for username in usernames]):
+                yield await result
+
+        return ndjson_response(completed())
+
+    results = await asyncio.gather(*(load(username) for username in usernames))
+    return TimedJSONResponse({"results": results})
+
+
+async def _load_profile(
+    request: Request,
+    username: str,
+    semaphore: asyncio.Semaphore | None = None,
+) -> RenderedResponse:
+    loader: CacheLoader = request.app.state.loader
+    return await loader.load(f"profile:{username}", _profile_fetcher(request.app.state, username, semaphore))
+
+
+async def prefetch_profile(state, username: str) -> None:
+    """Fetch and cache a profile ahead of requests; used by the prefetch queue."""
+    loader: CacheLoader = state.loader
+    await loader.fill(f"profile:{username}", _profile_fetcher(state, username))
+
+
+def _profile_fetcher(state, username: str, semaphore: asyncio.Semaphore | None = None) -> Fetcher:
+    api_client: GitHubAPIClient = state.github_api
+    scraper: GitHubScraper = state.github_scraper
+    graphql: GitHubGraphQLClient | None = state.github_graphql
+
+    async def fetch() -> RenderedResponse | Expiring:
+        if semaphore is None:
+            profile, degraded = await _fetch_profile(username, api_client, scraper, graphql)
+        else:
+            async with semaphore:
+                profile, degraded = await _fetch_profile(username, api_client, scraper, graphql)
+        rendered = RenderedResponse.render(GitHubProfile, profile)
+        # Without scraped data: retry sooner so the full profile replaces it once github.com is back.
+        return Expiring(rendered, settings.cache_degraded_ttl) if degraded else rendered
+
+    return fetch
+
+
+async def _fetch_profile(
+    username: str,
+    api_client: GitHubAPIClient,
+    scraper: GitHubScraper,
+    graphql: GitHubGraphQLClient | None = None,
+) -> tuple[dict, bool]:
+    """Return the profile in ``GitHubProfile``'s shape and whether scraped data is missing because scraping failed."""
+    if graphql is not None:
+        # GraphQL covers pinned repos and contributions; achievements still come from the page.
+        graphql_profile, scraped_data = await asyncio.gather(
+            graphql.get_profile(username),
+            scraper.scrape_profile(username),
+        )
+        if graphql_profile is None:
+            # Not a user to GraphQL (e.g. an organization): REST has it, or answers 404.
+            api_data = await api_client.get_user(username)
+        else:
+            api_data, graphql_data = graphql_profile
+            scraped_data = graphql_data | {
+                "achievements": scraped_data.get("achievements", []),
+                "degraded": scraped_data.get("degraded", False),
+            }
+    else:
+        api_data, scraped_data = await asyncio.gather(
+            api_client.get_user(username),
+            scraper.scrape_profile(username),
+        )
+
+    # Trusted upstream data: map it field by field, in field order, and render it
+    # directly instead of validating a GitHubProfile first.
+    with metrics.stage("model_build"):
+        contribution_stats = scraped_data.get("contribution_stats")
+        profile = {
+            "username": api_data["login"],
+            "name": api_data.get("name"),
+            "bio": api_data.get("bio"),
+            "avatar_url": api_data.get("avatar_url"),
+            "location": api_data.get("location"),
+            "company": api_data.get("company"),
+            "blog": api_data.get("blog") or None,
+            "twitter_username": api_data.get("twitter_username"),
+            "email": api_data.get("email"),
+            "public_repos": api_data.get("public_repos", 0),
+            "public_gists": api_data.get("public_gists", 0),
+            "followers": api_data.get("followers", 0),
+            "following": api_data.get("following", 0),
+            "created_at": api_data.get("created_at"),
+            "updated_at": api_data.get("updated_at"),
+            "pinned_repos": [
+                {
+                    "name": repo["name"],
+                    "description": repo.get("description"),
+                    "language": repo.get("language"),
+                    "stars": repo.get("stars", 0),
+                }
+                for repo in scraped_data.get("pinned_repos", [])
+            ],
+            "contribution_stats": None
+            if contribution_stats is None
+            else {"total_contributions_last_year": contribution_stats.get("total_contributions_last_year")},
+            "achievements": scraped_data.get("achievements", []),
+        }
+
+    return profile, scraped_data.get("degraded", False)
@@ -1,11 +1,24 @@
+from collections.abc import AsyncIterator
+
+import orjson
 from fastapi import APIRouter, Query, Request
+from pydantic import TypeAdapter
 
-from app.models.repository import GitHubRepository, RepositoriesResponse
-from app.services.cache import TTLCache
+from app.config import settings
+from app.models.repository import GitHubRepository, RepositoriesResponse, RepositoryStats
+from app.services.cache_backends import CacheBackend
 from app.services.github_api import GitHubAPIClient
+from app.services.loader import CacheLoader
+from app.services.metrics import metrics
+from app.services.ndjson import NDJSON_RESPONSE_DOC, ndjson_response, wants_ndjson
+from app.services.rendered import RenderedResponse
+from app.services.repo_index import RepoIndex
 
 router = APIRouter()
 
+# Validates a whole page of rows in one call into pydantic-core instead of one model at a time.
+_REPOSITORY_LIST = TypeAdapter(list[GitHubRepository])
+
 
 @router.get(
     "/repos/{username}",
@@ -14,13 +27,19 @@ router = APIRouter()
     description=(
         "Retrieve a paginated list of public repositories for a GitHub user. "
         "Supports sorting by creation date, last update, last push, name, or stars. "
-        "Results are cached for 5 minutes."
+        "With `all=true` (implied by `sort=stars` or any filter) the user's full repository list is "
+        "fetched once, cached, and paginated, sorted and filtered locally; once it is cached, every "
+        "page and sort for that user is served from it. "
+        "Results are cached for 5 minutes. "
+        "Send `Accept: application/x-ndjson` to receive one repository per line instead; "
+        "with `all=true` this streams the whole list."
     ),
     responses={
-        200: {"description": "Repositories retrieved successfully"},
+        200: {"description": "Repositories retrieved successfully", "content": NDJSON_RESPONSE_DOC},
         404: {"description": "GitHub user not found"},
         429: {"description": "Rate limit exceeded (GitHub API or local rate limit)"},
         502: {"description": "GitHub API upstream error"},
+        503: {"description": "GitHub API temporarily unavailable"},
     },
 )
 async def get_repositories(
@@ -29,45 +48,164 @@ async def get_repositories(
     page: int = Query(1, ge=1, description="Page number for pagination"),
     per_page: int = Query(30, ge=1, le=100, description="Number of repositories per page (max 100)"),
     sort: str = Query("updated", pattern="^(created|updated|pushed|full_name|stars)$", description="Sort by: created, updated, pushed, full_name, or stars"),
+    all_repos: bool = Query(False, alias="all", description="Fetch the complete repository list and paginate it locally"),
+    language: str | None = Query(None, description="Only repositories with this primary language (case-insensitive)"),
+    fork: bool | None = Query(None, description="Only forks (true) or only non-forks (false)"),
+    archived: bool | None = Query(None, description="Only archived (true) or only active (false) repositories"),
+    topic: str | None = Query(None, description="Only repositories tagged with this topic"),
 ):
-    cache: TTLCache = request.app.state.cache
+    loader: CacheLoader = request.app.state.loader
+    cache: CacheBackend = request.app.state.cache
     api_client: GitHubAPIClient = request.app.state.github_api
 
-    cache_key = f"repos:{username}:{page}:{per_page}:{sort}"
-    cached = cache.get(cache_key)
-    if cached:
-        return cached
+    index_key = f"repos:{username}:all"
+    # A TTL probe, not a read, so the load below is the only lookup counted as a hit or miss.
+    index_cached = await cache.ttl_remaining(index_key) is not None
+    filtered = language is not None or fork is not None or archived is not None or topic is not None
+    if all_repos or filtered or sort == "stars" or index_cached:
+        # Upstream pages arrive in name order, so a cold full_name listing can stream as it is fetched.
+        if wants_ndjson(request) and all_repos and sort == "full_name" and not filtered and not index_cached:
+            pages = api_client.iter_all_repos(
+                username,
+                concurrency=settings.repos_fetch_concurrency,
+                max_pages=settings.repos_fetch_max_pages,
+            )
+            # Fetch the first page before streaming starts so a 404 is still a proper error.
+            first_page = await anext(pages)
+            return ndjson_response(_stream_all_repositories(username, index_key, cache, first_page, pages))
 
-    repos_data = await api_client.get_repos(username, page, per_page, sort)
+        index: RepoIndex = await loader.load(index_key, lambda: _fetch_repo_index(username, api_client))
+        rows = index.query(sort, language=language, is_fork=fork, is_archived=archived, topic=topic)
+        if wants_ndjson(request) and all_repos:
+            return ndjson_response(index.rows(rows))
 
-    repositories = [
-        GitHubRepository(
-            name=r["name"],
-            full_name=r["full_name"],
-            description=r.get("description"),
-            html_url=r["html_url"],
-            language=r.get("language"),
-            topics=r.get("topics", []),
-            stars=r.get("stargazers_count", 0),
-            forks=r.get("forks_count", 0),
-            watchers=r.get("watchers_count", 0),
-            open_issues=r.get("open_issues_count", 0),
-            is_fork=r.get("fork", False),
-            is_archived=r.get("archived", False),
-            created_at=r.get("created_at"),
-            updated_at=r.get("updated_at"),
-            pushed_at=r.get("pushed_at"),
+        start = (page - 1) * per_page
+        repositories = index.rows(rows[start : start + per_page])
+        if wants_ndjson(request):
+            return ndjson_response(repositories)
+        response = RepositoriesResponse(
+            username=username,
+            total_count=len(repositories),
+            page=page,
+            per_page=per_page,
+            repositories=repositories,
         )
-        for r in repos_data
-    ]
-
-    response = RepositoriesResponse(
-        username=username,
-        total_count=len(repositories),
-        page=page,
-        per_page=per_page,
-        repositories=repositories,
+        return RenderedResponse.of(response).response(request, await cache.ttl_remaining(index_key))
+
+    page_key = f"repos:{username}:{page}:{per_page}:{sort}"
+    rendered = await loader.load(page_key, lambda: _fetch_repositories(username, page, per_page, sort, api_client))
+    if wants_ndjson(request):
+        return ndjson_response(orjson.loads(rendered.body)["repositories"])
+    return rendered.response(request, await cache.ttl_remaining(page_key))
+
+
+def _repository_row(r: dict) -> dict:
+    """Map a GitHub repository object to ``GitHubRepository``'s fields, in field order."""
+    return {
+        "name": r["name"],
+        "full_name": r["full_name"],
+        "description": r.get("description"),
+        "html_url": r["html_url"],
+        "language": r.get("language"),
+        "topics": r.get("topics", []),
+        "stars": r.get("stargazers_count", 0),
+        "forks": r.get("forks_count", 0),
+        "watchers": r.get("watchers_count", 0),
+        "open_issues": r.get("open_issues_count", 0),
+        "is_fork": r.get("fork", False),
+        "is_archived": r.get("archived", False),
+        "created_at": r.get("created_at"),
+        "updated_at": r.get("updated_at"),
+        "pushed_at": r.get("pushed_at"),
+    }
+
+
+def _to_repositories(repos_data: list[dict]) -> list[GitHubRepository]:
+    return _REPOSITORY_LIST.validate_python([_repository_row(r) for r in repos_data])
+
+
+async def _fetch_repo_index(username: str, api_client: GitHubAPIClient) -> RepoIndex:
+    repositories = []
+    async for repos_data in api_client.iter_all_repos(
+        username,
+        concurrency=settings.repos_fetch_concurrency,
+        max_pages=settings.repos_fetch_max_pages,
+    ):
+        repositories.extend(_to_repositories(repos_data))
+    return RepoIndex(username, repositories)
+
+
+async def prefetch_repositories(state, username: str) -> None:
+    """Fetch and cache a user's full repository list ahead of requests; used by the prefetch queue."""
+    loader: CacheLoader = state.loader
+    await loader.fill(f"repos:{username}:all", lambda: _fetch_repo_index(username, state.github_api))
+
+
+async def _stream_all_repositories(
+    username: str,
+    cache_key: str,
+    cache: CacheBackend,
+    first_page: list[dict],
+    pages: AsyncIterator[list[dict]],
+):
+    repositories = _to_repositories(first_page)
+    for repo in repositories:
+        yield repo
+    async for repos_data in pages:
+        page_repositories = _to_repositories(repos_data)
+        repositories.extend(page_repositories)
+        for repo in page_repositories:
+            yield repo
+    await cache.set(cache_key, RepoIndex(username, repositories))
+
+
+async def _fetch_repositories(
+    username: str,
+    page: int,
+    per_page: int,
+    sort: str,
+    api_client: GitHubAPIClient,
+) -> RenderedResponse:
+    repos_data = await api_client.get_repos(username, page, per_page, sort)
+
+    # Trusted upstream JSON: map it straight to the response shape and render that,
+    # without building and validating a model per repository.
+    with metrics.stage("model_build"):
+        repositories = [_repository_row(r) for r in repos_data]
+
+    return RenderedResponse.render(
+        RepositoriesResponse,
+        {
+            "username": username,
+            "total_count": len(repositories),
+            "page": page,
+            "per_page": per_page,
+            "repositories": repositories,
+        },
     )
 
-    cache.set(cache_key, response)
-    return response
+
+@router.get(
+    "/repos/{username}/stats",
+    response_model=RepositoryStats,
+    summary="Get GitHub user repository statistics",
+    description=(
+        "Aggregate a user's full public repository list: totals, stars and forks per language, "
+        "and the most common topics. Computed locally from the cached repository list."
+    ),
+    responses={
+        200: {"description": "Statistics computed successfully"},
+        404: {"description": "GitHub user not found"},
+        429: {"description": "Rate limit exceeded (GitHub API or local rate limit)"},
+        502: {"description": "GitHub API upstream error"},
+        503: {"description": "GitHub API temporarily unavailable"},
+    },
+)
+async def get_repository_stats(username: str, request: Request):
+    loader: CacheLoader = request.app.state.loader
+    cache: CacheBackend = request.app.state.cache
+    api_client: GitHubAPIClient = request.app.state.github_api
+
+    index_key = f"repos:{username}:all"
+    index: RepoIndex = await loader.load(index_key, lambda: _fetch_repo_index(username, api_client))
+    return RenderedResponse.of(index.stats()).response(request, await cache.ttl_remaining(index_key))
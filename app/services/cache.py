@@ -1,24 +1,153 @@
+import sys
 import time
+from collections import OrderedDict
 from typing import Any
 
 
+def _sizeof(value: Any) -> int:
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, tuple):
+        return sum(_sizeof(item) for item in value)
+    if hasattr(value, "model_dump_json"):
+        return len(value.model_dump_json())
+    return sys.getsizeof(value)
+
+
+def _grows(value: Any) -> bool:
+    """Whether the value is measured by its own ``__sizeof__`` and may grow once cached."""
+    return not isinstance(value, (bytes, bytearray, str, tuple)) and not hasattr(value, "model_dump_json")
+
+
 class TTLCache:
-    def __init__(self, default_ttl: int = 300):
-        self._cache: dict[str, tuple[Any, float]] = {}
+    """In-process LRU cache with per-entry TTL and entry-count/byte budgets.
+
+    Each entry has a soft expiry (``ttl``) and a hard expiry ``stale_ttl`` seconds
+    later. ``get`` only returns fresh values; ``get_entry`` also returns values
+    between the two expiries, flagged as stale, so callers can serve them while
+    refreshing. A budget of 0 disables that limit. Entries past their hard expiry
+    are dropped when read and by a full sweep that runs at most once per
+    ``sweep_interval`` seconds on write. Values sized by ``__sizeof__`` (such as
+    a rendered response that keeps compressed variants) are measured again on
+    each hit, so the byte budget follows what they hold now.
+    """
+
+    def __init__(
+        self,
+        default_ttl: int = 300,
+        max_entries: int = 0,
+        max_bytes: int = 0,
+        sweep_interval: int = 60,
+        stale_ttl: int = 0,
+    ):
+        self._cache: OrderedDict[str, tuple[Any, float, float, int]] = OrderedDict()
         self._default_ttl = default_ttl
+        self._stale_ttl = stale_ttl
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._sweep_interval = sweep_interval
+        self._next_sweep = time.time() + sweep_interval
+        self._bytes = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
 
     def get(self, key: str) -> Any | None:
-        if key not in self._cache:
+        entry = self.get_entry(key)
+        if entry is None or entry[1]:
+            return None
+        return entry[0]
+
+    def get_entry(self, key: str) -> tuple[Any, bool] | None:
+        """Return ``(value, is_stale)`` or None if the key is missing or past its hard expiry."""
+        entry = self._cache.get(key)
+        if entry is None:
+            self.misses += 1
             return None
-        value, expires_at = self._cache[key]
-        if time.time() > expires_at:
-            del self._cache[key]
+        value, soft_expires_at, hard_expires_at, size = entry
+        now = time.time()
+        if now > hard_expires_at:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
             return None
-        return value
+        self._cache.move_to_end(key)
+        if _grows(value) and (new_size := sys.getsizeof(value)) != size:
+            self._cache[key] = (value, soft_expires_at, hard_expires_at, new_size)
+            self._bytes += new_size - size
+            self._evict()
+        stale = now > soft_expires_at
+        if stale:
+            self.stale_hits += 1
+        else:
+            self.hits += 1
+        return value, stale
 
-    def set(self, key: str, value: Any, ttl: int | None = None) -> None:
-        expires_at = time.time() + (ttl if ttl is not None else self._default_ttl)
-        self._cache[key] = (value, expires_at)
+    def peek(self, key: str) -> tuple[Any, float, float] | None:
+        """``(value, soft_expires_at, hard_expires_at)`` without touching LRU order or stats."""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        return entry[:3]
+
+    def ttl_remaining(self, key: str) -> float | None:
+        """Seconds until the entry goes stale (negative once it is stale)."""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        return entry[1] - time.time()
+
+    def set(self, key: str, value: Any, ttl: int | None = None, stale_ttl: int | None = None) -> None:
+        now = time.time()
+        if now >= self._next_sweep:
+            self.sweep(now)
+
+        size = _sizeof(value)
+        if key in self._cache:
+            self._remove(key)
+        # Too big to keep; the old value is dropped all the same so it is not served in its place.
+        if self._max_bytes and size > self._max_bytes:
+            return
+        soft_expires_at = now + (ttl if ttl is not None else self._default_ttl)
+        hard_expires_at = soft_expires_at + (stale_ttl if stale_ttl is not None else self._stale_ttl)
+        self._cache[key] = (value, soft_expires_at, hard_expires_at, size)
+        self._bytes += size
+        self._evict()
+
+    def sweep(self, now: float | None = None) -> int:
+        now = now if now is not None else time.time()
+        expired = [key for key, (_, _, hard_expires_at, _) in self._cache.items() if now > hard_expires_at]
+        for key in expired:
+            self._remove(key)
+        self.expirations += len(expired)
+        self._next_sweep = now + self._sweep_interval
+        return len(expired)
 
     def clear(self) -> None:
         self._cache.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._cache),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _remove(self, key: str) -> None:
+        _, _, _, size = self._cache.pop(key)
+        self._bytes -= size
+
+    def _evict(self) -> None:
+        while (self._max_entries and len(self._cache) > self._max_entries) or (
+            self._max_bytes and self._bytes > self._max_bytes
+        ):
+            _, (_, _, _, evicted_size) = self._cache.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
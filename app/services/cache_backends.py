@@ -0,0 +1,400 @@
+import asyncio
+import json
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from app.models.profile import GitHubProfile
+from app.models.repository import RepositoriesResponse
+from app.services.cache import TTLCache
+from app.services.rendered import RenderedResponse
+from app.services.repo_index import RepoIndex
+
+try:
+    from redis.exceptions import RedisError
+except ImportError:  # only the Redis backends need it
+    RedisError = OSError
+
+
+@dataclass(frozen=True)
+class CachedError:
+    """An upstream error remembered in place of a value, e.g. a 404 for an unknown user."""
+
+    status_code: int
+    detail: str
+
+
+_CODECS: dict[str, tuple[type, Callable[[Any], bytes], Callable[[bytes], Any]]] = {}
+
+
+def register_codec(
+    cls: type,
+    dumps: Callable[[Any], bytes] | None = None,
+    loads: Callable[[bytes], Any] | None = None,
+) -> None:
+    """Make ``cls`` storable in shared backends. Pydantic models need no callables."""
+    dumps = dumps or (lambda value: value.model_dump_json().encode())
+    loads = loads or cls.model_validate_json
+    _CODECS[cls.__name__] = (cls, dumps, loads)
+
+
+def _load_rendered(model_name: bytes, rendered_at: bytes, body: bytes) -> RenderedResponse:
+    return RenderedResponse(_CODECS[model_name.decode()][0], body, float(rendered_at))
+
+
+def encode(value: Any) -> bytes:
+    name = type(value).__name__
+    if name not in _CODECS:
+        raise TypeError(f"No cache codec registered for {name}")
+    return name.encode() + b"\n" + _CODECS[name][1](value)
+
+
+def decode(data: bytes) -> Any:
+    name, body = data.split(b"\n", 1)
+    return _CODECS[name.decode()][2](body)
+
+
+register_codec(GitHubProfile)
+register_codec(RepositoriesResponse)
+register_codec(RepoIndex, dumps=RepoIndex.to_bytes, loads=RepoIndex.from_bytes)
+register_codec(
+    RenderedResponse,
+    dumps=lambda rendered: f"{rendered.model_type.__name__}\n{rendered.rendered_at}\n".encode() + rendered.body,
+    loads=lambda data: _load_rendered(*data.split(b"\n", 2)),
+)
+register_codec(
+    CachedError,
+    dumps=lambda error: json.dumps([error.status_code, error.detail]).encode(),
+    loads=lambda data: CachedError(*json.loads(data)),
+)
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    async def get_entry(self, key: str) -> tuple[Any, bool] | None:
+        """Return ``(value, is_stale)`` or None on a miss."""
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: int | None = None, stale_ttl: int | None = None) -> None: ...
+
+    @abstractmethod
+    async def ttl_remaining(self, key: str) -> float | None: ...
+
+    @abstractmethod
+    async def clear(self) -> None: ...
+
+    @abstractmethod
+    def stats(self) -> dict[str, int]: ...
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    def __init__(self, cache: TTLCache):
+        self._cache = cache
+
+    async def get_entry(self, key: str) -> tuple[Any, bool] | None:
+        return self._cache.get_entry(key)
+
+    async def set(self, key: str, value: Any, ttl: int | None = None, stale_ttl: int | None = None) -> None:
+        self._cache.set(key, value, ttl, stale_ttl)
+
+    async def ttl_remaining(self, key: str) -> float | None:
+        return self._cache.ttl_remaining(key)
+
+    async def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict[str, int]:
+        return self._cache.stats()
+
+
+class RedisCacheBackend(CacheBackend):
+    """Cache shared by all workers in a Redis-compatible store.
+
+    Values are stored as ``<soft expiry>\\n<codec>\\n<json>`` with the store's own
+    expiry set to the hard expiry, so stale entries disappear without a sweep.
+    When the store is unreachable, reads count as misses and writes are skipped,
+    so requests fall back to upstream instead of failing.
+    """
+
+    def __init__(self, redis, default_ttl: int = 300, stale_ttl: int = 0, prefix: str = "ghp:"):
+        self._redis = redis
+        self._default_ttl = default_ttl
+        self._stale_ttl = stale_ttl
+        self._prefix = prefix
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def get_entry(self, key: str) -> tuple[Any, bool] | None:
+        try:
+            data = await self._redis.get(self._prefix + key)
+        except (RedisError, OSError):
+            self.errors += 1
+            self.misses += 1
+            return None
+        if data is None:
+            self.misses += 1
+            return None
+        soft_expires_at, payload = data.split(b"\n", 1)
+        try:
+            value = decode(payload)
+        except Exception:
+            self.errors += 1
+            self.misses += 1
+            return None
+        stale = time.time() > float(soft_expires_at)
+        if stale:
+            self.stale_hits += 1
+        else:
+            self.hits += 1
+        return value, stale
+
+    async def set(self, key: str, value: Any, ttl: int | None = None, stale_ttl: int | None = None) -> None:
+        ttl = ttl if ttl is not None else self._default_ttl
+        hard_ttl = ttl + (stale_ttl if stale_ttl is not None else self._stale_ttl)
+        if hard_ttl <= 0:
+            return
+        soft_expires_at = f"{time.time() + ttl:.3f}".encode()
+        try:
+            await self._redis.set(self._prefix + key, soft_expires_at + b"\n" + encode(value), px=int(hard_ttl * 1000))
+        except (RedisError, OSError):
+            self.errors += 1
+
+    async def ttl_remaining(self, key: str) -> float | None:
+        try:
+            header = await self._redis.getrange(self._prefix + key, 0, 31)
+        except (RedisError, OSError):
+            self.errors += 1
+            return None
+        if not header:
+            return None
+        return float(header.split(b"\n", 1)[0]) - time.time()
+
+    async def clear(self) -> None:
+        keys = [key async for key in self._redis.scan_iter(match=self._prefix + "*")]
+        if keys:
+            await self._redis.delete(*keys)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+class TieredCacheBackend(CacheBackend):
+    """Small in-process L1 in front of a shared L2.
+
+    L1 only holds values read fresh from L2, for at most ``l1_ttl`` seconds, so a
+    value refreshed by another worker is picked up quickly. Stale reads come from L2.
+    """
+
+    def __init__(self, l1: MemoryCacheBackend, l2: CacheBackend, l1_ttl: int = 10):
+        self._l1 = l1
+        self._l2 = l2
+        self._l1_ttl = l1_ttl
+
+    async def get_entry(self, key: str) -> tuple[Any, bool] | None:
+        entry = await self._l1.get_entry(key)
+        if entry is not None:
+            return entry
+        entry = await self._l2.get_entry(key)
+        if entry is not None and not entry[1]:
+            await self._l1.set(key, entry[0], ttl=self._l1_ttl, stale_ttl=0)
+        return entry
+
+    async def set(self, key: str, value: Any, ttl: int | None = None, stale_ttl: int | None = None) -> None:
+        await self._l2.set(key, value, ttl, stale_ttl)
+        l1_ttl = self._l1_ttl if ttl is None else min(self._l1_ttl, ttl)
+        await self._l1.set(key, value, ttl=l1_ttl, stale_ttl=0)
+
+    async def ttl_remaining(self, key: str) -> float | None:
+        return await self._l2.ttl_remaining(key)
+
+    async def clear(self) -> None:
+        await self._l1.clear()
+        await self._l2.clear()
+
+    def stats(self) -> dict[str, int]:
+        stats = {f"l1_{name}": value for name, value in self._l1.stats().items()}
+        stats.update({f"l2_{name}": value for name, value in self._l2.stats().items()})
+        return stats
+
+    async def close(self) -> None:
+        await self._l2.close()
+
+
+class SnapshotCacheBackend(CacheBackend):
+    """In-process cache whose entries survive restarts through a SQLite snapshot.
+
+    Entries written since the last snapshot are saved every ``snapshot()`` call,
+    with their expiry times, from a worker thread. Nothing is read at startup:
+    a key missing in memory is looked up in the snapshot by primary key, from a
+    worker thread, and if it has not passed its hard expiry it is copied back
+    into memory with its remaining TTLs. Startup time therefore does not depend
+    on snapshot size. Keys found missing are remembered, up to ``max_absent`` of
+    them, so repeated misses for them do not go to SQLite again.
+    """
+
+    def __init__(self, memory: MemoryCacheBackend, cache: TTLCache, path: str, max_absent: int = 10000):
+        self._memory = memory
+        self._cache = cache
+        self._path = path
+        self._reader = self._connect()
+        self._absent: OrderedDict[str, None] = OrderedDict()
+        self._max_absent = max_absent
+        self._dirty: set[str] = set()
+        self._lock = asyncio.Lock()
+        self.loaded = 0
+        self.saved = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self._path, check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA busy_timeout=5000")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, soft_expires_at REAL NOT NULL, hard_expires_at REAL NOT NULL)"
+        )
+        return db
+
+    async def get_entry(self, key: str) -> tuple[Any, bool] | None:
+        entry = await self._memory.get_entry(key)
+        if entry is not None:
+            return entry
+        return await self._restore(key)
+
+    async def _restore(self, key: str) -> tuple[Any, bool] | None:
+        """Copy a key from the snapshot back into memory, if it is there and not expired."""
+        if key in self._absent:
+            self._absent.move_to_end(key)
+            return None
+        row = await asyncio.to_thread(self._read, key)
+        now = time.time()
+        if row is None or row[2] <= now:
+            self._mark_absent(key)
+            return None
+        data, soft_expires_at, hard_expires_at = row
+        try:
+            value = decode(data)
+        except Exception:
+            self._mark_absent(key)
+            return None
+        self.loaded += 1
+        self._cache.set(key, value, ttl=soft_expires_at - now, stale_ttl=hard_expires_at - soft_expires_at)
+        return value, now > soft_expires_at
+
+    def _mark_absent(self, key: str) -> None:
+        self._absent[key] = None
+        if len(self._absent) > self._max_absent:
+            self._absent.popitem(last=False)
+
+    def _read(self, key: str) -> tuple[bytes, float, float] | None:
+        return self._reader.execute(
+            "SELECT value, soft_expires_at, hard_expires_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+
+    async def set(self, key: str, value: Any, ttl: int | None = None, stale_ttl: int | None = None) -> None:
+        await self._memory.set(key, value, ttl, stale_ttl)
+        self._dirty.add(key)
+
+    async def ttl_remaining(self, key: str) -> float | None:
+        remaining = await self._memory.ttl_remaining(key)
+        if remaining is None and await self._restore(key) is not None:
+            remaining = await self._memory.ttl_remaining(key)
+        return remaining
+
+    async def clear(self) -> None:
+        await self._memory.clear()
+        self._dirty.clear()
+        self._absent.clear()
+        await asyncio.to_thread(self._reader.execute, "DELETE FROM entries")
+
+    async def snapshot(self) -> int:
+        """Save entries written since the last snapshot and drop expired rows."""
+        async with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            entries = [(key, entry) for key in dirty if (entry := self._cache.peek(key)) is not None]
+            saved = await asyncio.to_thread(self._write, entries, time.time())
+            # Saved keys can be restored if memory evicts them before they expire.
+            for key, _ in entries:
+                self._absent.pop(key, None)
+            self.saved += saved
+            return saved
+
+    def _write(self, entries: list[tuple[str, tuple[Any, float, float]]], now: float) -> int:
+        rows = []
+        for key, (value, soft_expires_at, hard_expires_at) in entries:
+            try:
+                rows.append((key, encode(value), soft_expires_at, hard_expires_at))
+            except TypeError:
+                continue
+        db = sqlite3.connect(self._path, isolation_level=None)
+        try:
+            db.execute("PRAGMA busy_timeout=5000")
+            with db:
+                db.execute("BEGIN")
+                db.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)", rows)
+                db.execute("DELETE FROM entries WHERE hard_expires_at <= ?", (now,))
+        finally:
+            db.close()
+        return len(rows)
+
+    async def run_snapshots(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.snapshot()
+
+    def stats(self) -> dict[str, int]:
+        return self._memory.stats() | {"snapshot_loaded": self.loaded, "snapshot_saved": self.saved}
+
+    async def close(self) -> None:
+        await self.snapshot()
+        self._reader.close()
+
+
+def build_cache_backend(settings) -> CacheBackend:
+    if settings.cache_backend == "memory":
+        cache = TTLCache(
+            default_ttl=settings.cache_ttl,
+            max_entries=settings.cache_max_entries,
+            max_bytes=settings.cache_max_bytes,
+            sweep_interval=settings.cache_sweep_interval,
+            stale_ttl=settings.cache_stale_ttl,
+        )
+        if settings.cache_snapshot_path:
+            return SnapshotCacheBackend(MemoryCacheBackend(cache), cache, settings.cache_snapshot_path)
+        return MemoryCacheBackend(cache)
+
+    import redis.asyncio
+
+    shared = RedisCacheBackend(
+        redis.asyncio.from_url(settings.redis_url),
+        default_ttl=settings.cache_ttl,
+        stale_ttl=settings.cache_stale_ttl,
+    )
+    if settings.cache_backend == "redis":
+        return shared
+
+    l1 = MemoryCacheBackend(
+        TTLCache(
+            default_ttl=settings.cache_l1_ttl,
+            max_entries=settings.cache_l1_max_entries,
+            max_bytes=settings.cache_max_bytes,
+            sweep_interval=settings.cache_sweep_interval,
+        )
+    )
+    return TieredCacheBackend(l1, shared, l1_ttl=settings.cache_l1_ttl)
@@ -0,0 +1,73 @@
+import time
+
+
+class CircuitBreaker:
+    """Stop calling an upstream that keeps failing.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    ``allow()`` returns False, so callers fail fast instead of waiting on
+    timeouts. Once the open period has passed, one probe call is let through
+    (half-open): success closes the breaker, failure opens it again for twice
+    as long, up to ``max_reset_timeout``.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 5.0, max_reset_timeout: float = 120.0):
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._max_reset_timeout = max_reset_timeout
+        self._open_for = reset_timeout
+        self._opened_at = 0.0
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        now = time.monotonic()
+        # Open period over, or a probe never reported back: let one call through.
+        if now - self._opened_at >= self._open_for:
+            self.state = self.HALF_OPEN
+            self._opened_at = now
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._open_for = self._reset_timeout
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN:
+            self._open_for = min(self._open_for * 2, self._max_reset_timeout)
+            self._open()
+        elif self.state == self.CLOSED and self.failures >= self._failure_threshold:
+            self._open()
+
+    def _open(self) -> None:
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        self.trips += 1
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "open": int(self.state != self.CLOSED),
+            "open_for": self._open_for if self.state != self.CLOSED else 0.0,
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
+
+
+def build_circuit_breaker(settings) -> CircuitBreaker:
+    return CircuitBreaker(
+        failure_threshold=settings.circuit_failure_threshold,
+        reset_timeout=settings.circuit_reset_timeout,
+        max_reset_timeout=settings.circuit_max_reset_timeout,
+    )
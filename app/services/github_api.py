@@ -1,38 +1,105 @@
+import asyncio
+import json
+from collections.abc import AsyncIterator
+
 import httpx
 from fastapi import HTTPException
 
 from app.config import settings
+from app.services.cache import TTLCache
+from app.services.circuit_breaker import CircuitBreaker, build_circuit_breaker
+from app.services.metrics import metrics
+from app.services.token_pool import TokenPool, build_token_pool
 
 
 class GitHubAPIClient:
-    BASE_URL = "https://api.github.com"
-
-    def __init__(self, client: httpx.AsyncClient):
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        validators: TTLCache | None = None,
+        token_pool: TokenPool | None = None,
+        base_url: str | None = None,
+        breaker: CircuitBreaker | None = None,
+    ):
         self._client = client
+        self._base_url = (base_url or settings.github_api_url).rstrip("/")
+        self._tokens = token_pool or build_token_pool(settings)
+        self.breaker = breaker or build_circuit_breaker(settings)
+        # URL -> (ETag, Last-Modified, body) from the last 200, used for conditional requests.
+        self._validators = validators or TTLCache(
+            default_ttl=settings.github_etag_ttl,
+            max_entries=settings.github_etag_max_entries,
+            max_bytes=settings.github_etag_max_bytes,
+        )
+        self.requests = 0
+        self.not_modified = 0
 
-    def _headers(self) -> dict[str, str]:
+    def _headers(self, token: str) -> dict[str, str]:
         headers = {
             "Accept": "application/vnd.github+json",
             "X-GitHub-Api-Version": "2022-11-28",
         }
-        if settings.github_token:
-            headers["Authorization"] = f"Bearer {settings.github_token}"
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
         return headers
 
-    async def get_user(self, username: str) -> dict:
-        resp = await self._client.get(
-            f"{self.BASE_URL}/users/{username}",
-            headers=self._headers(),
-        )
+    async def _get(self, path: str, username: str, params: dict | None = None):
+        url = f"{self._base_url}{path}"
+        cache_key = str(httpx.URL(url, params=params))
+        conditional = {}
+        stored = self._validators.get(cache_key)
+        if stored:
+            etag, last_modified, _ = stored
+            if etag:
+                conditional["If-None-Match"] = etag
+            if last_modified:
+                conditional["If-Modified-Since"] = last_modified
+
+        if not self.breaker.allow():
+            raise HTTPException(status_code=503, detail="GitHub API temporarily unavailable")
+        while True:
+            budget = await self._tokens.acquire()
+            self.requests += 1
+            try:
+                with metrics.stage("github_rest"):
+                    resp = await self._client.get(url, headers=self._headers(budget.token) | conditional, params=params)
+            except httpx.TransportError as exc:
+                self._tokens.release(budget)
+                self.breaker.record_failure()
+                raise HTTPException(status_code=502, detail="GitHub API upstream error") from exc
+            except asyncio.CancelledError:
+                self._tokens.release(budget)
+                raise
+            self._tokens.update(budget, resp.headers)
+            # A primary rate limit on one token: retry on another, or wait for a reset.
+            if resp.status_code not in (403, 429) or resp.headers.get("X-RateLimit-Remaining") != "0":
+                break
+
+        if resp.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        if resp.status_code == 304 and stored:
+            self.not_modified += 1
+            self._validators.set(cache_key, stored)
+            return json.loads(stored[2])
         if resp.status_code == 404:
             raise HTTPException(status_code=404, detail=f"GitHub user '{username}' not found")
-        if resp.status_code == 403:
+        if resp.status_code in (403, 429):
             raise HTTPException(status_code=429, detail="GitHub API rate limit exceeded")
         if resp.status_code >= 500:
             raise HTTPException(status_code=502, detail="GitHub API upstream error")
         resp.raise_for_status()
+
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if etag or last_modified:
+            self._validators.set(cache_key, (etag, last_modified, resp.content))
         return resp.json()
 
+    async def get_user(self, username: str) -> dict:
+        return await self._get(f"/users/{username}", username)
+
     async def get_repos(
         self,
         username: str,
@@ -40,16 +107,61 @@ class GitHubAPIClient:
         per_page: int = 30,
         sort: str = "updated",
     ) -> list[dict]:
-        resp = await self._client.get(
-            f"{self.BASE_URL}/users/{username}/repos",
-            headers=self._headers(),
+        return await self._get(
+            f"/users/{username}/repos",
+            username,
             params={"page": page, "per_page": per_page, "sort": sort, "direction": "desc"},
         )
-        if resp.status_code == 404:
-            raise HTTPException(status_code=404, detail=f"GitHub user '{username}' not found")
-        if resp.status_code == 403:
-            raise HTTPException(status_code=429, detail="GitHub API rate limit exceeded")
-        if resp.status_code >= 500:
-            raise HTTPException(status_code=502, detail="GitHub API upstream error")
-        resp.raise_for_status()
-        return resp.json()
+
+    async def iter_all_repos(
+        self,
+        username: str,
+        concurrency: int = 4,
+        max_pages: int = 50,
+    ) -> AsyncIterator[list[dict]]:
+        """Yield every page of a user's repositories, in order, sorted by name.
+
+        The page count comes from ``public_repos``; pages 2..N are fetched
+        concurrently. Name order keeps pages stable while they are fetched in parallel.
+        """
+        per_page = 100
+        repos = await self.get_repos(username, 1, per_page, "full_name")
+        yield repos
+        if len(repos) < per_page:
+            return
+
+        user = await self.get_user(username)
+        last_page = min(max(2, -(-user.get("public_repos", 0) // per_page)), max_pages)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(page: int) -> list[dict]:
+            async with semaphore:
+                return await self.get_repos(username, page, per_page, "full_name")
+
+        tasks = [asyncio.create_task(fetch(page)) for page in range(2, last_page + 1)]
+        try:
+            for task in tasks:
+                repos = await task
+                yield repos
+                if len(repos) < per_page:
+                    return
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        # public_repos can lag behind; keep going while pages are full.
+        page = last_page
+        while len(repos) == per_page and page < max_pages:
+            page += 1
+            repos = await self.get_repos(username, page, per_page, "full_name")
+            yield repos
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "requests": self.requests,
+            "not_modified": self.not_modified,
+            "validators": self._validators.stats()["entries"],
+        }
+
+    def token_stats(self) -> list[dict]:
+        return self._tokens.stats()
@@ -0,0 +1,188 @@
+import asyncio
+
+import httpx
+from fastapi import HTTPException
+
+from app.config import settings
+from app.services.circuit_breaker import CircuitBreaker, build_circuit_breaker
+from app.services.metrics import metrics
+from app.services.token_pool import TokenPool
+
+PROFILE_FIELDS = """
+fragment ProfileFields on User {
+  login
+  name
+  bio
+  avatarUrl
+  location
+  company
+  websiteUrl
+  twitterUsername
+  email
+  createdAt
+  updatedAt
+  repositories(privacy: PUBLIC) { totalCount }
+  gists(privacy: PUBLIC) { totalCount }
+  followers { totalCount }
+  following { totalCount }
+  pinnedItems(first: 6, types: REPOSITORY) {
+    nodes { ... on Repository { name description primaryLanguage { name } stargazerCount } }
+  }
+  contributionsCollection { contributionCalendar { totalContributions } }
+}
+"""
+
+
+class GitHubGraphQLClient:
+    """Fetch profiles, pinned repos and contribution counts through the GraphQL API.
+
+    Concurrent ``get_profile`` calls made within ``batch_window`` seconds are sent
+    as one aliased query. Achievement badges are not exposed by GraphQL, so
+    callers still scrape the profile page for them.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        token_pool: TokenPool,
+        batch_window: float = 0.01,
+        max_batch: int = 25,
+        url: str | None = None,
+        breaker: CircuitBreaker | None = None,
+    ):
+        self._client = client
+        self._url = url or f"{settings.github_api_url.rstrip('/')}/graphql"
+        # GraphQL is served by the same host as REST, so the two normally share one breaker.
+        self.breaker = breaker or build_circuit_breaker(settings)
+        self._tokens = token_pool
+        self._batch_window = batch_window
+        self._max_batch = max_batch
+        self._pending: dict[str, list[asyncio.Future]] = {}
+        self._flush_timer: asyncio.TimerHandle | None = None
+        self._batches: set[asyncio.Task] = set()
+        self.queries = 0
+        self.profiles = 0
+
+    async def get_profile(self, username: str) -> tuple[dict, dict] | None:
+        """Return ``(api_data, scraped_data)`` shaped like the REST client and scraper output.
+
+        None when GraphQL has no user by that login, which is also the case for
+        organizations; callers fall back to REST to tell the two apart.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(username, []).append(future)
+        if len(self._pending) >= self._max_batch:
+            self._flush()
+        elif self._flush_timer is None:
+            self._flush_timer = loop.call_later(self._batch_window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run(self, batch: dict[str, list[asyncio.Future]]) -> None:
+        usernames = list(batch)
+        try:
+            data = await self._query(usernames)
+        except Exception as exc:
+            for futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(exc)
+            return
+
+        for i, username in enumerate(usernames):
+            node = data.get(f"u{i}")
+            for future in batch[username]:
+                if not future.done():
+                    future.set_result(None if node is None else self._to_profile(node))
+
+    async def _query(self, usernames: list[str]) -> dict:
+        variables = {f"u{i}": username for i, username in enumerate(usernames)}
+        query = (
+            "query(" + ", ".join(f"${name}: String!" for name in variables) + ") {\n"
+            + "\n".join(f"  {name}: user(login: ${name}) {{ ...ProfileFields }}" for name in variables)
+            + "\n}\n" + PROFILE_FIELDS
+        )
+
+        if not self.breaker.allow():
+            raise HTTPException(status_code=503, detail="GitHub API temporarily unavailable")
+        budget = await self._tokens.acquire()
+        self.queries += 1
+        try:
+            with metrics.stage("github_graphql"):
+                resp = await self._client.post(
+                    self._url,
+                    json={"query": query, "variables": variables},
+                    headers={"Authorization": f"Bearer {budget.token}"},
+                )
+        except httpx.TransportError as exc:
+            self._tokens.release(budget)
+            self.breaker.record_failure()
+            raise HTTPException(status_code=502, detail="GitHub API upstream error") from exc
+        except asyncio.CancelledError:
+            self._tokens.release(budget)
+            raise
+        self._tokens.update(budget, resp.headers)
+        if resp.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        if resp.status_code in (403, 429):
+            raise HTTPException(status_code=429, detail="GitHub API rate limit exceeded")
+        if resp.status_code >= 500:
+            raise HTTPException(status_code=502, detail="GitHub API upstream error")
+        resp.raise_for_status()
+
+        body = resp.json()
+        if body.get("data") is None:
+            raise HTTPException(status_code=502, detail="GitHub API upstream error")
+        self.profiles += len(usernames)
+        return body["data"]
+
+    @staticmethod
+    def _to_profile(node: dict) -> tuple[dict, dict]:
+        api_data = {
+            "login": node["login"],
+            "name": node.get("name"),
+            "bio": node.get("bio"),
+            "avatar_url": node.get("avatarUrl"),
+            "location": node.get("location"),
+            "company": node.get("company"),
+            "blog": node.get("websiteUrl"),
+            "twitter_username": node.get("twitterUsername"),
+            "email": node.get("email") or None,
+            "public_repos": node["repositories"]["totalCount"],
+            "public_gists": node["gists"]["totalCount"],
+            "followers": node["followers"]["totalCount"],
+            "following": node["following"]["totalCount"],
+            "created_at": node.get("createdAt"),
+            "updated_at": node.get("updatedAt"),
+        }
+        pinned_repos = [
+            {
+                "name": repo["name"],
+                "description": repo.get("description"),
+                "language": (repo.get("primaryLanguage") or {}).get("name"),
+                "stars": repo.get("stargazerCount", 0),
+            }
+            for repo in node["pinnedItems"]["nodes"]
+            if repo
+        ]
+        calendar = node["contributionsCollection"]["contributionCalendar"]
+        scraped_data = {
+            "pinned_repos": pinned_repos,
+            "contribution_stats": {"total_contributions_last_year": calendar["totalContributions"]},
+        }
+        return api_data, scraped_data
+
+    def stats(self) -> dict[str, int]:
+        return {"queries": self.queries, "profiles": self.profiles}
@@ -1,76 +1,110 @@
-import re
-
 import httpx
-from bs4 import BeautifulSoup
 
-from app.models.profile import ContributionStats, PinnedRepo
+from app.config import settings
+from app.services.circuit_breaker import CircuitBreaker, build_circuit_breaker
+from app.services.metrics import metrics
+from app.services.parse_executor import ParseExecutor, ParseQueueFull
+from app.services.profile_parsers import empty_profile_data
+
+# The yearly contribution heading is the last section the parsers need; the
+# sidebar (achievements) and pinned items come before it in the page.
+LAST_SECTION_MARKER = b"js-yearly-contributions"
+LAST_SECTION_END = b"</h2>"
 
 
 class GitHubScraper:
-    def __init__(self, client: httpx.AsyncClient):
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        executor: ParseExecutor | None = None,
+        max_bytes: int | None = None,
+        base_url: str | None = None,
+        breaker: CircuitBreaker | None = None,
+    ):
         self._client = client
+        self._base_url = (base_url or settings.github_web_url).rstrip("/")
+        self._executor = executor or ParseExecutor("inline", settings.scraper_parser)
+        self._max_bytes = max_bytes or settings.scraper_max_bytes
+        self.breaker = breaker or build_circuit_breaker(settings)
+        self.bytes_read = 0
+        self.stopped_early = 0
+        self.truncated = 0
+        self.degraded = 0
+        self.parse_errors = 0
 
     async def scrape_profile(self, username: str) -> dict:
-        """Scrape GitHub profile page for data not available via REST API."""
-        try:
-            resp = await self._client.get(
-                f"https://github.com/{username}",
-                headers={"User-Agent": "Mozilla/5.0 (compatible; GitHubParser/1.0)"},
-                follow_redirects=True,
-            )
-            if resp.status_code != 200:
-                return {"pinned_repos": [], "contribution_stats": None, "achievements": []}
+        """Scrape GitHub profile page for data not available via REST API.
 
-            soup = BeautifulSoup(resp.text, "lxml")
-
-            return {
-                "pinned_repos": self._parse_pinned_repos(soup),
-                "contribution_stats": self._parse_contributions(soup),
-                "achievements": self._parse_achievements(soup),
-            }
+        Never raises. When github.com is failing, or the breaker is open, the
+        result is empty and carries ``"degraded": True``; so is it when the parse
+        queue is full. A page the parser fails on gives an empty result without
+        the flag and counts in ``parse_errors``.
+        """
+        if not self.breaker.allow():
+            return self._degraded()
+        try:
+            with metrics.stage("scrape_download"):
+                async with self._client.stream(
+                    "GET",
+                    f"{self._base_url}/{username}",
+                    headers={"User-Agent": "Mozilla/5.0 (compatible; GitHubParser/1.0)"},
+                    follow_redirects=True,
+                ) as resp:
+                    # github.com answers 429 when it throttles scrapers.
+                    if resp.status_code >= 500 or resp.status_code == 429:
+                        self.breaker.record_failure()
+                        return self._degraded()
+                    self.breaker.record_success()
+                    if resp.status_code != 200:
+                        return empty_profile_data()
+                    body = await self._read_page(resp)
+        except httpx.TransportError:
+            self.breaker.record_failure()
+            return self._degraded()
         except Exception:
-            return {"pinned_repos": [], "contribution_stats": None, "achievements": []}
+            return self._degraded()
 
-    def _parse_pinned_repos(self, soup: BeautifulSoup) -> list[PinnedRepo]:
-        pinned = []
-        for item in soup.select(".pinned-item-list-item-content"):
-            name_el = item.select_one("a.text-bold span")
-            name = name_el.get_text(strip=True) if name_el else None
-            if not name:
-                continue
-
-            desc_el = item.select_one("p.pinned-item-desc")
-            description = desc_el.get_text(strip=True) if desc_el else None
-
-            lang_el = item.select_one("[itemprop='programmingLanguage']")
-            language = lang_el.get_text(strip=True) if lang_el else None
+        try:
+            return await self._executor.parse(body)
+        except ParseQueueFull:
+            # Shed under load: like an outage, cache briefly so the full profile follows soon.
+            return self._degraded()
+        except Exception:
+            # A parser bug, not an outage: the page was fetched, so keep the normal TTL.
+            self.parse_errors += 1
+            return empty_profile_data()
 
-            stars = 0
-            star_el = item.select_one("a[href$='/stargazers']")
-            if star_el:
-                star_text = star_el.get_text(strip=True).replace(",", "")
-                stars = int(star_text) if star_text.isdigit() else 0
+    def _degraded(self) -> dict:
+        self.degraded += 1
+        return empty_profile_data() | {"degraded": True}
 
-            pinned.append(PinnedRepo(name=name, description=description, language=language, stars=stars))
-        return pinned
+    async def _read_page(self, resp: httpx.Response) -> bytes:
+        """Read the page until the sections we parse are complete or the size cap is hit.
 
-    def _parse_contributions(self, soup: BeautifulSoup) -> ContributionStats | None:
-        heading = soup.select_one("h2.f4.text-normal.mb-2")
-        if not heading:
-            return None
-        text = heading.get_text(strip=True)
-        match = re.search(r"([\d,]+)\s+contributions?\s+in\s+the\s+last\s+year", text)
-        if not match:
-            return None
-        count = int(match.group(1).replace(",", ""))
-        return ContributionStats(total_contributions_last_year=count)
+        Bytes are kept undecoded; the parsers cope with the truncated document.
+        """
+        body = bytearray()
+        marker_at = -1
+        async for chunk in resp.aiter_bytes():
+            scan_from = max(len(body) - len(LAST_SECTION_MARKER), 0)
+            body += chunk
+            if len(body) >= self._max_bytes:
+                del body[self._max_bytes :]
+                self.truncated += 1
+                break
+            if marker_at < 0:
+                marker_at = body.find(LAST_SECTION_MARKER, scan_from)
+            if marker_at >= 0 and body.find(LAST_SECTION_END, max(marker_at, scan_from)) >= 0:
+                self.stopped_early += 1
+                break
+        self.bytes_read += len(body)
+        return bytes(body)
 
-    def _parse_achievements(self, soup: BeautifulSoup) -> list[str]:
-        achievements = []
-        for badge in soup.select("img.achievement-badge-sidebar"):
-            alt = badge.get("alt", "")
-            if alt and alt not in ("", "Achievement"):
-                name = alt.replace("Achievement: ", "")
-                if name not in achievements:
-                    achievements.append(name)
-        return achievements
+    def stats(self) -> dict[str, int]:
+        return {
+            "bytes_read": self.bytes_read,
+            "stopped_early": self.stopped_early,
+            "truncated": self.truncated,
+            "degraded": self.degraded,
+            "parse_errors": self.parse_errors,
+        }
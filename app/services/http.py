@@ -0,0 +1,54 @@
+from importlib.util import find_spec
+
+import httpx
+
+from app.config import Settings
+
+
+def _build_client(settings: Settings, connect: float, read: float, pool: float) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        # HTTP/2 needs the optional h2 package; without it the client stays on HTTP/1.1.
+        http2=settings.http2_enabled and find_spec("h2") is not None,
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(connect=connect, read=read, write=read, pool=pool),
+    )
+
+
+def build_http_clients(settings: Settings) -> tuple[httpx.AsyncClient, httpx.AsyncClient]:
+    """Return ``(api_client, web_client)`` for api.github.com and github.com.
+
+    Each host gets its own pool, so the connection limits apply per host and a
+    slow profile page never holds a connection the REST API is waiting for.
+    """
+    api_client = _build_client(
+        settings,
+        settings.github_api_connect_timeout,
+        settings.github_api_read_timeout,
+        settings.github_api_pool_timeout,
+    )
+    web_client = _build_client(
+        settings,
+        settings.github_web_connect_timeout,
+        settings.github_web_read_timeout,
+        settings.github_web_pool_timeout,
+    )
+    return api_client, web_client
+
+
+def pool_stats(client: httpx.AsyncClient) -> dict[str, int]:
+    """Connection pool utilization; all zeros for transports without a pool."""
+    pool = getattr(client._transport, "_pool", None)
+    connections = list(getattr(pool, "connections", ()))
+    requests = getattr(pool, "_requests", ())
+    idle = sum(1 for connection in connections if connection.is_idle())
+    return {
+        "connections": len(connections),
+        "idle": idle,
+        "in_use": len(connections) - idle,
+        "queued": sum(1 for request in requests if request.is_queued()),
+        "max_connections": getattr(pool, "_max_connections", 0) or 0,
+    }
@@ -0,0 +1,126 @@
+import asyncio
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from typing import Any, NamedTuple
+
+from fastapi import HTTPException
+
+from app.services.cache_backends import CacheBackend, CachedError
+from app.services.metrics import metrics
+from app.services.singleflight import SingleFlight
+
+Fetcher = Callable[[], Awaitable[Any]]
+
+
+class Expiring(NamedTuple):
+    """Returned by a fetcher to cache ``value`` for ``ttl`` seconds instead of the default."""
+
+    value: Any
+    ttl: int
+
+
+class CacheLoader:
+    """Read-through access to the cache with coalescing and stale-while-revalidate.
+
+    Fresh entries are returned as-is. Stale entries are returned immediately while
+    a single background task refreshes them. Misses are fetched once per key no
+    matter how many callers are waiting.
+
+    A 404 from the fetcher is cached for ``not_found_ttl`` seconds and raised
+    again on later hits. When refreshing a stale entry fails with an upstream
+    error, the stale value is kept for another stale period rather than dropped.
+    """
+
+    def __init__(self, cache: CacheBackend, flights: SingleFlight, hot_keys: int = 0, not_found_ttl: int = 0):
+        self._cache = cache
+        self._flights = flights
+        self._hot_keys = hot_keys
+        self._not_found_ttl = not_found_ttl
+        self._hits: Counter[str] = Counter()
+        self._fetchers: dict[str, Fetcher] = {}
+        self._background: set[asyncio.Task] = set()
+        self.refreshes = 0
+        self.negative_hits = 0
+        self.stale_kept = 0
+        # Misses being fetched while a caller waits; background work backs off while this is non-zero.
+        self.live_misses = 0
+
+    async def load(self, key: str, fetch: Fetcher) -> Any:
+        if self._hot_keys:
+            self._hits[key] += 1
+            self._fetchers[key] = fetch
+
+        with metrics.stage("cache"):
+            entry = await self._cache.get_entry(key)
+        if entry is not None:
+            value, stale = entry
+            if isinstance(value, CachedError):
+                self.negative_hits += 1
+                raise HTTPException(status_code=value.status_code, detail=value.detail)
+            if stale:
+                self.refresh(key, fetch, value)
+            return value
+
+        self.live_misses += 1
+        try:
+            return await self._flights.do(key, lambda: self._fetch(key, fetch))
+        finally:
+            self.live_misses -= 1
+
+    async def fill(self, key: str, fetch: Fetcher) -> Any:
+        """Fetch ``key`` and cache it whatever its current state, to warm the cache ahead of requests."""
+        return await self._flights.do(key, lambda: self._fetch(key, fetch))
+
+    def refresh(self, key: str, fetch: Fetcher, stale: Any = None) -> None:
+        if self._flights.in_flight(key):
+            return
+        self.refreshes += 1
+        task = asyncio.create_task(self._flights.do(key, lambda: self._fetch(key, fetch, stale)))
+        self._background.add(task)
+        task.add_done_callback(self._background_done)
+
+    async def refresh_hot_keys(self, horizon: float) -> int:
+        """Refresh the most requested keys that will go stale within ``horizon`` seconds."""
+        hot = [key for key, _ in self._hits.most_common(self._hot_keys)]
+        fetchers = self._fetchers
+        self._hits = Counter()
+        self._fetchers = {}
+
+        refreshed = 0
+        for key in hot:
+            remaining = await self._cache.ttl_remaining(key)
+            if remaining is not None and remaining < horizon:
+                self.refresh(key, fetchers[key])
+                refreshed += 1
+        return refreshed
+
+    async def run_refresh_ahead(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.refresh_hot_keys(interval)
+
+    async def _fetch(self, key: str, fetch: Fetcher, stale: Any = None) -> Any:
+        try:
+            value = await fetch()
+        except HTTPException as exc:
+            if exc.status_code == 404 and self._not_found_ttl:
+                await self._cache.set(key, CachedError(404, exc.detail), ttl=self._not_found_ttl, stale_ttl=0)
+            elif exc.status_code >= 500 and stale is not None:
+                # GitHub is failing: keep serving what we have instead of letting it expire.
+                self.stale_kept += 1
+                await self._cache.set(key, stale, ttl=0)
+            raise
+
+        ttl = None
+        if isinstance(value, Expiring):
+            value, ttl = value
+        await self._cache.set(key, value, ttl)
+        return value
+
+    def stats(self) -> dict[str, int]:
+        return {"refreshes": self.refreshes, "negative_hits": self.negative_hits, "stale_kept": self.stale_kept}
+
+    def _background_done(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,112 @@
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from fastapi.responses import ORJSONResponse
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+def _labels(labels: Labels, extra: str = "") -> str:
+    parts = [f'{name}="{value}"' for name, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _le(bound) -> str:
+    return f'le="{bound}"'
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram, one series per label set."""
+
+    def __init__(self, name: str, help: str, buckets: tuple[float, ...] = BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self._counts: dict[Labels, list[int]] = defaultdict(lambda: [0] * (len(buckets) + 1))
+        self._sums: dict[Labels, float] = defaultdict(float)
+
+    def observe(self, seconds: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        counts = self._counts[key]
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+        self._sums[key] += seconds
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, counts in self._counts.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(key, _le(bound))} {cumulative}")
+            cumulative += counts[-1]
+            lines.append(f"{self.name}_bucket{_labels(key, _le('+Inf'))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(key)} {self._sums[key]}")
+            lines.append(f"{self.name}_count{_labels(key)} {cumulative}")
+        return lines
+
+
+class Metrics:
+    """Process-wide request and stage latency histograms.
+
+    Counters and gauges owned by other services (cache, token pool, connection
+    pools, ...) are read from their ``stats()`` when ``/metrics`` is rendered.
+    """
+
+    def __init__(self):
+        self.requests = Histogram("ghp_request_duration_seconds", "HTTP request latency by route.")
+        self.stages = Histogram("ghp_stage_duration_seconds", "Time spent in each request stage.")
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float) -> None:
+        self.requests.observe(seconds, method=method, route=route, status=str(status))
+
+    def observe_stage(self, stage: str, seconds: float) -> None:
+        self.stages.observe(seconds, stage=stage)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(name, time.perf_counter() - started_at)
+
+    def render(self, gauges: list[tuple[str, dict[str, str], float]]) -> str:
+        """Prometheus text format: the histograms plus ``(name, labels, value)`` samples.
+
+        Samples named ``*_total`` are typed as counters, everything else as gauges.
+        Samples of one metric are grouped under a single HELP and TYPE header,
+        whatever order they were collected in.
+        """
+        lines = self.requests.render() + self.stages.render()
+        families: dict[str, list[tuple[dict[str, str], float]]] = defaultdict(list)
+        for name, labels, value in gauges:
+            families[name].append((labels, value))
+        for name, samples in families.items():
+            description = name.removeprefix("ghp_").removesuffix("_total").replace("_", " ").capitalize()
+            lines.append(f"# HELP {name} {description}.")
+            lines.append(f"# TYPE {name} {'counter' if name.endswith('_total') else 'gauge'}")
+            for labels, value in samples:
+                lines.append(f"{name}{_labels(tuple(labels.items()))} {float(value)}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+class TimedJSONResponse(ORJSONResponse):
+    """``ORJSONResponse`` that records JSON rendering time as the ``serialize`` stage."""
+
+    def render(self, content) -> bytes:
+        with metrics.stage("serialize"):
+            return super().render(content)
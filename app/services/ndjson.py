@@ -0,0 +1,40 @@
+from collections.abc import AsyncIterable, Iterable
+from typing import Any
+
+import orjson
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from app.services.rendered import header_qualities
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+NDJSON_RESPONSE_DOC = {NDJSON_MEDIA_TYPE: {"schema": {"type": "string", "description": "One JSON object per line"}}}
+
+
+def wants_ndjson(request: Request) -> bool:
+    """True when NDJSON is asked for by name (q > 0) and not ranked below plain JSON."""
+    ranges = header_qualities(request.headers.get("accept", ""))
+    quality = ranges.get(NDJSON_MEDIA_TYPE, 0.0)
+    return quality > 0 and quality >= ranges.get("application/json", 0.0)
+
+
+def _line(item: BaseModel | dict[str, Any]) -> bytes:
+    if isinstance(item, BaseModel):
+        return item.model_dump_json().encode() + b"\n"
+    return orjson.dumps(item) + b"\n"
+
+
+def ndjson_response(items: AsyncIterable[BaseModel | dict] | Iterable[BaseModel | dict]) -> StreamingResponse:
+    """Stream each model, or dict already in a model's shape, as one JSON line as soon as it is produced."""
+
+    async def lines():
+        if isinstance(items, AsyncIterable):
+            async for item in items:
+                yield _line(item)
+        else:
+            for item in items:
+                yield _line(item)
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
@@ -0,0 +1,86 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from app.services.metrics import metrics
+from app.services.profile_parsers import ProfileParser, get_parser
+
+_worker_parsers: dict[str, ProfileParser] = {}
+
+
+class ParseQueueFull(Exception):
+    pass
+
+
+def _parse(parser_name: str, html: bytes, submitted_at: float) -> tuple[dict, float, float]:
+    """Worker entry point: raw bytes in, a small dict plus timings out."""
+    started_at = time.monotonic()
+    parser = _worker_parsers.get(parser_name)
+    if parser is None:
+        parser = _worker_parsers[parser_name] = get_parser(parser_name)
+    result = parser.parse(html)
+    return result, started_at - submitted_at, time.monotonic() - started_at
+
+
+class ParseExecutor:
+    """Run profile parsing off the event loop.
+
+    ``kind`` is ``thread``, ``process`` or ``inline`` (parse on the loop, for tests
+    and debugging). At most ``max_workers + max_queue`` parses may be outstanding;
+    beyond that ``ParseQueueFull`` is raised instead of letting the backlog grow.
+    """
+
+    def __init__(self, kind: str = "thread", parser_name: str = "lxml", max_workers: int = 4, max_queue: int = 32):
+        self._kind = kind
+        self._parser_name = parser_name
+        self._capacity = max_workers + max_queue
+        self._executor: Executor | None = None
+        if kind == "thread":
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="parse")
+        elif kind == "process":
+            self._executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.queue_wait_seconds = 0.0
+        self.parse_seconds = 0.0
+
+    async def parse(self, html: bytes) -> dict:
+        if self.in_flight >= self._capacity:
+            self.rejected += 1
+            raise ParseQueueFull(f"{self.in_flight} profile parses already queued")
+
+        self.in_flight += 1
+        try:
+            submitted_at = time.monotonic()
+            if self._executor is None:
+                result, waited, parsed = _parse(self._parser_name, html, submitted_at)
+            else:
+                loop = asyncio.get_running_loop()
+                result, waited, parsed = await loop.run_in_executor(
+                    self._executor, _parse, self._parser_name, html, submitted_at
+                )
+        finally:
+            self.in_flight -= 1
+
+        self.completed += 1
+        self.queue_wait_seconds += waited
+        self.parse_seconds += parsed
+        metrics.observe_stage("parse_queue", waited)
+        metrics.observe_stage("parse", parsed)
+        return result
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "kind": self._kind,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "queue_wait_seconds": self.queue_wait_seconds,
+            "parse_seconds": self.parse_seconds,
+        }
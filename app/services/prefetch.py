@@ -0,0 +1,282 @@
+import asyncio
+import heapq
+import itertools
+import sqlite3
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import astuple, dataclass
+
+from fastapi import HTTPException
+
+from app.services.loader import CacheLoader
+from app.services.token_pool import TokenPool
+
+Runner = Callable[[str], Awaitable[object]]
+
+# GitHub API requests reserved before a job runs: a profile is one user lookup (the
+# page scrape does not count against the API budget), a repository index at least
+# the first page plus the user lookup. Requests a job makes beyond this, such as
+# further pages of a large repository list, are charged once it finishes.
+JOB_COST = {"profile": 1, "repos": 2}
+# Assumed until a response says when the rate-limit window resets.
+RATE_LIMIT_WINDOW = 3600
+POLL_INTERVAL = 0.1
+
+
+@dataclass
+class PrefetchJob:
+    username: str
+    kind: str
+    priority: int = 5
+    run_at: float = 0.0
+    interval: int = 0
+    attempts: int = 0
+
+    @property
+    def key(self) -> tuple[str, str]:
+        return self.username, self.kind
+
+
+class PrefetchQueue:
+    """Fill the cache for known usernames in the background, ahead of requests.
+
+    A job is a (username, kind) pair; ``runners`` maps each kind to the coroutine
+    that fetches and caches it. Jobs are stored in SQLite, so a restart picks up
+    where the last run stopped, and are run by ``workers`` tasks in priority order
+    (0 first) once due. Jobs with an ``interval`` are scheduled again after each
+    run. Failures are retried with backoff up to ``max_attempts`` times; a 404
+    drops the job.
+
+    Prefetch spends at most ``budget_share`` of the GitHub API budget left in the
+    current rate-limit window, so it slows down as the budget runs low and never
+    uses up what live traffic needs. Each job reserves its ``JOB_COST`` up front
+    and is charged for the requests the token pool counted while it ran. It also
+    holds back while requests are waiting on cache misses.
+    """
+
+    def __init__(
+        self,
+        loader: CacheLoader,
+        tokens: TokenPool,
+        runners: dict[str, Runner],
+        path: str = "",
+        workers: int = 2,
+        budget_share: float = 0.5,
+        max_attempts: int = 5,
+    ):
+        self._loader = loader
+        self._tokens = tokens
+        self._runners = runners
+        self._workers = workers
+        self._budget_share = budget_share
+        self._max_attempts = max_attempts
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False, isolation_level=None)
+        if path:
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "username TEXT NOT NULL, kind TEXT NOT NULL, priority INTEGER NOT NULL, run_at REAL NOT NULL, "
+            "interval INTEGER NOT NULL, attempts INTEGER NOT NULL, PRIMARY KEY (username, kind))"
+        )
+        self._lock = asyncio.Lock()
+        self._pending: dict[tuple[str, str], PrefetchJob] = {}
+        self._active: dict[tuple[str, str], PrefetchJob] = {}
+        self._ready: list[tuple[int, int, PrefetchJob]] = []
+        self._delayed: list[tuple[float, int, PrefetchJob]] = []
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._next_slot = 0.0
+        self._charged_to = 0
+        self._tasks: list[asyncio.Task] = []
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+        self.deferred = 0
+
+    def start(self) -> None:
+        """Load the stored jobs and start the workers."""
+        for row in self._db.execute("SELECT username, kind, priority, run_at, interval, attempts FROM jobs"):
+            self._push(PrefetchJob(*row))
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self._workers)]
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._db.close()
+
+    async def enqueue(
+        self,
+        usernames: Iterable[str],
+        kinds: Iterable[str],
+        priority: int = 5,
+        interval: int = 0,
+    ) -> int:
+        """Queue each username for each kind, replacing jobs already queued for them."""
+        now = time.time()
+        kinds = list(kinds)
+        jobs = [
+            PrefetchJob(username, kind, priority, now, interval)
+            for username in dict.fromkeys(usernames)
+            for kind in kinds
+        ]
+        await self._write("INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?)", [astuple(job) for job in jobs])
+        for job in jobs:
+            self._push(job)
+        return len(jobs)
+
+    async def remove(self, username: str) -> int:
+        """Drop the user's queued jobs; a job already running finishes but is not scheduled again."""
+        removed = [key for key in self._pending if key[0] == username]
+        for key in removed:
+            del self._pending[key]
+        for key in [key for key in self._active if key[0] == username]:
+            del self._active[key]
+        await self._write("DELETE FROM jobs WHERE username = ?", [(username,)])
+        return len(removed)
+
+    def budget_rate(self) -> float:
+        """GitHub API requests per second prefetch may spend right now."""
+        return sum(
+            self._budget_share * budget["remaining"] / max(budget["reset_in"] or RATE_LIMIT_WINDOW, 1)
+            for budget in self._tokens.stats()
+        )
+
+    def _push(self, job: PrefetchJob) -> None:
+        self._pending[job.key] = job
+        if job.run_at <= time.time():
+            heapq.heappush(self._ready, (job.priority, next(self._seq), job))
+        else:
+            heapq.heappush(self._delayed, (job.run_at, next(self._seq), job))
+        self._wakeup.set()
+
+    async def _next_job(self) -> PrefetchJob:
+        while True:
+            now = time.time()
+            while self._delayed and self._delayed[0][0] <= now:
+                _, _, job = heapq.heappop(self._delayed)
+                heapq.heappush(self._ready, (job.priority, next(self._seq), job))
+            while self._ready:
+                _, _, job = heapq.heappop(self._ready)
+                # Skip heap entries for jobs that were replaced or removed since.
+                if self._pending.get(job.key) is job:
+                    del self._pending[job.key]
+                    return job
+
+            self._wakeup.clear()
+            timeout = self._delayed[0][0] - now if self._delayed else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except TimeoutError:
+                pass
+
+    async def _throttle(self, cost: int) -> None:
+        """Wait for this job's share of the budget, then for live misses to clear."""
+        waited = False
+        while (rate := self.budget_rate()) <= 0:
+            waited = True
+            await asyncio.sleep(POLL_INTERVAL)
+        now = time.monotonic()
+        start = max(self._next_slot, now)
+        self._next_slot = start + cost / rate
+        if start > now:
+            await asyncio.sleep(start - now)
+        while self._loader.live_misses:
+            waited = True
+            await asyncio.sleep(POLL_INTERVAL)
+        if waited:
+            self.deferred += 1
+
+    async def _work(self) -> None:
+        while True:
+            job = await self._next_job()
+            self._active[job.key] = job
+            try:
+                await self._run(job)
+            except HTTPException as exc:
+                await self._failed(job, exc.status_code)
+            except Exception:
+                await self._failed(job, 502)
+            else:
+                self.completed += 1
+                job.attempts = 0
+                await self._finish(job)
+
+    async def _run(self, job: PrefetchJob) -> None:
+        cost = JOB_COST.get(job.kind, 1)
+        await self._throttle(cost)
+        started = self._tokens.requests()
+        try:
+            await self._runners[job.kind](job.username)
+        finally:
+            self._charge(started, cost)
+
+    def _charge(self, started: int, reserved: int) -> None:
+        """Push the next slot back by what the job spent beyond its reservation.
+
+        Requests are counted pool-wide, so ones already charged to a job that ran
+        alongside are skipped.
+        """
+        total = self._tokens.requests()
+        spent = total - max(started, self._charged_to)
+        self._charged_to = total
+        rate = self.budget_rate()
+        if spent > reserved and rate > 0:
+            self._next_slot = max(self._next_slot, time.monotonic()) + (spent - reserved) / rate
+
+    async def _failed(self, job: PrefetchJob, status_code: int) -> None:
+        job.attempts += 1
+        if status_code != 404 and job.attempts < self._max_attempts:
+            self.retried += 1
+            await self._finish(job, retry_in=min(30 * 2**job.attempts, RATE_LIMIT_WINDOW))
+            return
+        self.failed += 1
+        job.attempts = 0
+        if status_code == 404:
+            job.interval = 0
+        await self._finish(job)
+
+    async def _finish(self, job: PrefetchJob, retry_in: float | None = None) -> None:
+        # Removed while it ran, or queued again and the new job owns the stored row.
+        if self._active.pop(job.key, None) is not job or job.key in self._pending:
+            return
+        if retry_in is None and job.interval:
+            retry_in = job.interval
+        if retry_in is None:
+            await self._write("DELETE FROM jobs WHERE username = ? AND kind = ?", [job.key])
+            return
+        job.run_at = time.time() + retry_in
+        await self._write("INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?)", [astuple(job)])
+        self._push(job)
+
+    async def _write(self, sql: str, rows: list[tuple]) -> None:
+        async with self._lock:
+            await asyncio.to_thread(self._write_rows, sql, rows)
+
+    def _write_rows(self, sql: str, rows: list[tuple]) -> None:
+        with self._db:
+            self._db.execute("BEGIN")
+            self._db.executemany(sql, rows)
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "pending": len(self._pending),
+            "running": len(self._active),
+            "budget_rate": self.budget_rate(),
+            "completed": self.completed,
+            "failed": self.failed,
+            "retried": self.retried,
+            "deferred": self.deferred,
+        }
+
+
+def build_prefetch_queue(settings, loader: CacheLoader, tokens: TokenPool, runners: dict[str, Runner]) -> PrefetchQueue:
+    return PrefetchQueue(
+        loader,
+        tokens,
+        runners,
+        path=settings.prefetch_db_path,
+        workers=settings.prefetch_workers,
+        budget_share=settings.prefetch_budget_share,
+        max_attempts=settings.prefetch_max_attempts,
+    )
@@ -0,0 +1,157 @@
+import re
+from abc import ABC, abstractmethod
+
+from bs4 import BeautifulSoup
+from lxml import etree
+
+CONTRIBUTIONS_RE = re.compile(r"([\d,]+)\s+contributions?\s+in\s+the\s+last\s+year")
+
+
+def empty_profile_data() -> dict:
+    return {"pinned_repos": [], "contribution_stats": None, "achievements": []}
+
+
+class ProfileParser(ABC):
+    """Extract pinned repos, contribution count and achievements from a profile page.
+
+    Results are plain dicts so they can be cached or sent between processes.
+    """
+
+    name: str
+
+    @abstractmethod
+    def parse(self, html: str | bytes) -> dict: ...
+
+
+def _contribution_stats(text: str) -> dict | None:
+    match = CONTRIBUTIONS_RE.search(text)
+    if not match:
+        return None
+    return {"total_contributions_last_year": int(match.group(1).replace(",", ""))}
+
+
+def _stars(text: str) -> int:
+    text = text.replace(",", "")
+    return int(text) if text.isdigit() else 0
+
+
+def _achievement_names(alts) -> list[str]:
+    achievements = []
+    for alt in alts:
+        if alt and alt not in ("", "Achievement"):
+            name = alt.replace("Achievement: ", "")
+            if name not in achievements:
+                achievements.append(name)
+    return achievements
+
+
+class SoupProfileParser(ProfileParser):
+    """Reference implementation: full BeautifulSoup tree plus CSS selectors."""
+
+    name = "bs4"
+
+    def parse(self, html: str | bytes) -> dict:
+        soup = BeautifulSoup(html, "lxml")
+        return {
+            "pinned_repos": self._parse_pinned_repos(soup),
+            "contribution_stats": self._parse_contributions(soup),
+            "achievements": _achievement_names(badge.get("alt", "") for badge in soup.select("img.achievement-badge-sidebar")),
+        }
+
+    def _parse_pinned_repos(self, soup: BeautifulSoup) -> list[dict]:
+        pinned = []
+        for item in soup.select(".pinned-item-list-item-content"):
+            name_el = item.select_one("a.text-bold span")
+            name = name_el.get_text(strip=True) if name_el else None
+            if not name:
+                continue
+
+            desc_el = item.select_one("p.pinned-item-desc")
+            description = desc_el.get_text(strip=True) if desc_el else None
+
+            lang_el = item.select_one("[itemprop='programmingLanguage']")
+            language = lang_el.get_text(strip=True) if lang_el else None
+
+            star_el = item.select_one("a[href$='/stargazers']")
+            stars = _stars(star_el.get_text(strip=True)) if star_el else 0
+
+            pinned.append({"name": name, "description": description, "language": language, "stars": stars})
+        return pinned
+
+    def _parse_contributions(self, soup: BeautifulSoup) -> dict | None:
+        heading = soup.select_one("h2.f4.text-normal.mb-2")
+        if not heading:
+            return None
+        return _contribution_stats(heading.get_text(strip=True))
+
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+class LxmlProfileParser(ProfileParser):
+    """Fast implementation: libxml2 tree plus precompiled XPath, no soup objects.
+
+    Produces the same output as ``SoupProfileParser``.
+    """
+
+    name = "lxml"
+
+    _pinned_items = etree.XPath(f"//*[{_has_class('pinned-item-list-item-content')}]")
+    _pinned_name = etree.XPath(f"(.//a[{_has_class('text-bold')}]//span)[1]")
+    _pinned_desc = etree.XPath(f"(.//p[{_has_class('pinned-item-desc')}])[1]")
+    _pinned_lang = etree.XPath("(.//*[@itemprop='programmingLanguage'])[1]")
+    _pinned_stars = etree.XPath("(.//a[substring(@href, string-length(@href) - 10) = '/stargazers'])[1]")
+    _heading = etree.XPath(f"(//h2[{_has_class('f4')} and {_has_class('text-normal')} and {_has_class('mb-2')}])[1]")
+    _achievements = etree.XPath(f"//img[{_has_class('achievement-badge-sidebar')}]/@alt")
+    # Mirrors get_text(): skip comments and script/style contents.
+    _text_nodes = etree.XPath(".//text()[not(parent::script) and not(parent::style)]")
+
+    def parse(self, html: str | bytes) -> dict:
+        if isinstance(html, str):
+            html = html.encode()
+        # A parser per call: lxml parser objects must not be shared between threads.
+        root = etree.fromstring(html, etree.HTMLParser(encoding="utf-8"))
+        if root is None:
+            return empty_profile_data()
+
+        heading = self._heading(root)
+        return {
+            "pinned_repos": self._parse_pinned_repos(root),
+            "contribution_stats": _contribution_stats(self._text(heading[0])) if heading else None,
+            "achievements": _achievement_names(self._achievements(root)),
+        }
+
+    def _parse_pinned_repos(self, root) -> list[dict]:
+        pinned = []
+        for item in self._pinned_items(root):
+            name_el = self._pinned_name(item)
+            name = self._text(name_el[0]) if name_el else None
+            if not name:
+                continue
+
+            desc_el = self._pinned_desc(item)
+            lang_el = self._pinned_lang(item)
+            star_el = self._pinned_stars(item)
+            pinned.append(
+                {
+                    "name": name,
+                    "description": self._text(desc_el[0]) if desc_el else None,
+                    "language": self._text(lang_el[0]) if lang_el else None,
+                    "stars": _stars(self._text(star_el[0])) if star_el else 0,
+                }
+            )
+        return pinned
+
+    def _text(self, element) -> str:
+        return "".join(text.strip() for text in self._text_nodes(element))
+
+
+PARSERS: dict[str, type[ProfileParser]] = {
+    SoupProfileParser.name: SoupProfileParser,
+    LxmlProfileParser.name: LxmlProfileParser,
+}
+
+
+def get_parser(name: str) -> ProfileParser:
+    return PARSERS[name]()
@@ -0,0 +1,136 @@
+import gzip
+import hashlib
+import time
+from typing import Any
+
+import orjson
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from app.config import settings
+from app.services.metrics import metrics
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip is offered
+    brotli = None
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.response_brotli_quality)
+    return gzip.compress(body, compresslevel=settings.response_gzip_level, mtime=0)
+
+
+def header_qualities(header: str) -> dict[str, float]:
+    """Map each item of an Accept-style header (media range, encoding) to its ``q`` value."""
+    qualities = {}
+    for item in header.lower().split(","):
+        name, *params = item.split(";")
+        quality = 1.0
+        for param in params:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.strip()] = quality
+    return qualities
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """Pick ``br`` or ``gzip`` from an Accept-Encoding header, preferring brotli."""
+    accepted = {name for name, quality in header_qualities(accept_encoding).items() if quality > 0}
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison, ignoring the per-encoding suffix added to compressed variants."""
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip().removeprefix("W/")
+        for suffix in ('-br"', '-gzip"'):
+            if tag.endswith(suffix):
+                tag = tag[: -len(suffix)] + '"'
+        if tag == etag:
+            return True
+    return False
+
+
+class RenderedResponse:
+    """A response model rendered once to JSON bytes, with a strong ETag over them.
+
+    This is what the cache stores for full responses: a hit is answered with
+    ``body`` as-is, without validating the model against ``response_model`` or
+    encoding it again. The model is parsed back only when a caller needs it.
+    Compressed variants are made on first request and kept with the entry.
+    """
+
+    __slots__ = ("model_type", "body", "etag", "rendered_at", "_encoded")
+
+    def __init__(self, model_type: type[BaseModel], body: bytes, rendered_at: float | None = None):
+        self.model_type = model_type
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        self.rendered_at = time.time() if rendered_at is None else rendered_at
+        self._encoded: dict[str, bytes] = {}
+
+    @classmethod
+    def of(cls, model: BaseModel) -> "RenderedResponse":
+        with metrics.stage("serialize"):
+            return cls(type(model), model.model_dump_json().encode())
+
+    @classmethod
+    def render(cls, model_type: type[BaseModel], content: dict[str, Any]) -> "RenderedResponse":
+        """Render plain data already in ``model_type``'s shape, skipping model construction.
+
+        For data mapped field by field from trusted GitHub JSON. With keys in field
+        order the bytes are the same as ``of(model_type(**content))`` would produce.
+        """
+        with metrics.stage("serialize"):
+            return cls(model_type, orjson.dumps(content))
+
+    def model(self) -> BaseModel:
+        return self.model_type.model_validate_json(self.body)
+
+    def encoded(self, encoding: str) -> bytes:
+        if encoding not in self._encoded:
+            with metrics.stage("compress"):
+                self._encoded[encoding] = _compress(self.body, encoding)
+        return self._encoded[encoding]
+
+    def response(self, request: Request, max_age: float | None = None) -> Response:
+        """Serve the body, a compressed variant or a 304, with validators and freshness headers.
+
+        Routes pass the cache entry's remaining TTL as ``max_age``; without it, what
+        is left of the default cache TTL since the body was rendered is assumed.
+        """
+        if max_age is None:
+            max_age = self.rendered_at + settings.cache_ttl - time.time()
+        headers = {
+            "ETag": self.etag,
+            "Vary": "Accept-Encoding",
+            "Cache-Control": f"public, max-age={max(int(max_age), 0)}, stale-while-revalidate={settings.cache_stale_ttl}",
+        }
+
+        encoding = None
+        if settings.response_compress_min_bytes and len(self.body) >= settings.response_compress_min_bytes:
+            encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+        if encoding:
+            headers["ETag"] = f'{self.etag[:-1]}-{encoding}"'
+
+        if etag_matches(request.headers.get("if-none-match", ""), self.etag):
+            return Response(status_code=304, headers=headers)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+            return Response(self.encoded(encoding), media_type="application/json", headers=headers)
+        return Response(self.body, media_type="application/json", headers=headers)
+
+    def __sizeof__(self) -> int:
+        return len(self.body) + sum(len(variant) for variant in self._encoded.values())
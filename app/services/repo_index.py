@@ -0,0 +1,223 @@
+from array import array
+from collections import Counter
+from datetime import datetime
+
+import orjson
+
+from app.models.repository import GitHubRepository, LanguageStats, RepositoryStats, TopicStats
+
+# Column attribute -> array typecode, in stored order.
+_COLUMNS = {
+    "stars": "q",
+    "forks": "q",
+    "language": "i",
+    "is_fork": "b",
+    "is_archived": "b",
+    "created": "q",
+    "updated": "q",
+    "pushed": "q",
+}
+
+
+def _timestamp(value: str | None) -> int:
+    if not value:
+        return 0
+    return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp())
+
+
+class RepoIndex:
+    """One user's full repository list plus columns for sorting, filtering and aggregates.
+
+    Numeric fields are kept in typed arrays, languages as ids into a small table,
+    and topics as an inverted index, so every page/sort/filter combination is
+    answered in-process from a single cached dataset. Shared cache backends store
+    it in that form too (``to_bytes``): a hit there rebuilds no columns, and rows
+    are parsed from their JSON only when a page asks for them.
+    """
+
+    def __init__(self, username: str, repositories: list[GitHubRepository]):
+        self.username = username
+        self._rows: list[GitHubRepository | None] = list(repositories)
+        # Set when loaded from bytes: the rows' JSON and where each row starts in it.
+        self._row_json = b""
+        self._row_starts: array | None = None
+        self.languages: list[str] = []
+        language_ids: dict[str, int] = {}
+
+        self.stars = array("q")
+        self.forks = array("q")
+        self.language = array("i")
+        self.is_fork = array("b")
+        self.is_archived = array("b")
+        self.created = array("q")
+        self.updated = array("q")
+        self.pushed = array("q")
+        self.topics: dict[str, array] = {}
+
+        for i, repo in enumerate(repositories):
+            self.stars.append(repo.stars)
+            self.forks.append(repo.forks)
+            if repo.language is None:
+                self.language.append(-1)
+            else:
+                if repo.language not in language_ids:
+                    language_ids[repo.language] = len(self.languages)
+                    self.languages.append(repo.language)
+                self.language.append(language_ids[repo.language])
+            self.is_fork.append(repo.is_fork)
+            self.is_archived.append(repo.is_archived)
+            self.created.append(_timestamp(repo.created_at))
+            self.updated.append(_timestamp(repo.updated_at))
+            self.pushed.append(_timestamp(repo.pushed_at))
+            for topic in repo.topics:
+                self.topics.setdefault(topic.lower(), array("i")).append(i)
+
+        self._orders: dict[str, list[int]] = {}
+        self._size: int | None = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __sizeof__(self) -> int:
+        # Used by the cache byte budget: rows dominate, so count them as serialized JSON.
+        if self._size is None:
+            if self._row_starts is not None:
+                self._size = len(self._row_json)
+            else:
+                self._size = sum(len(repo.model_dump_json()) for repo in self._rows)
+        return self._size
+
+    @property
+    def repositories(self) -> list[GitHubRepository]:
+        if self._row_starts is not None:
+            self._rows = [self._row(i) for i in range(len(self._rows))]
+            self._row_json = b""
+            self._row_starts = None
+        return self._rows
+
+    def _row(self, i: int) -> GitHubRepository:
+        row = self._rows[i]
+        if row is None:
+            # Rows are separated by one byte (a comma, or the closing bracket after the last).
+            data = self._row_json[self._row_starts[i] : self._row_starts[i + 1] - 1]
+            row = self._rows[i] = GitHubRepository.model_validate_json(data)
+        return row
+
+    def _order(self, sort: str) -> list[int]:
+        """Row ids in descending ``sort`` order, computed once per sort key."""
+        if sort not in self._orders:
+            if sort == "full_name":
+                names = [repo.full_name.lower() for repo in self.repositories]
+                key = names.__getitem__
+            else:
+                column = {
+                    "stars": self.stars,
+                    "created": self.created,
+                    "updated": self.updated,
+                    "pushed": self.pushed,
+                }[sort]
+                key = column.__getitem__
+            self._orders[sort] = sorted(range(len(self)), key=key, reverse=True)
+        return self._orders[sort]
+
+    def query(
+        self,
+        sort: str = "updated",
+        language: str | None = None,
+        is_fork: bool | None = None,
+        is_archived: bool | None = None,
+        topic: str | None = None,
+    ) -> list[int]:
+        order = self._order(sort)
+        if language is None and is_fork is None and is_archived is None and topic is None:
+            return order
+
+        language_ids = None
+        if language is not None:
+            lowered = language.lower()
+            language_ids = {i for i, name in enumerate(self.languages) if name.lower() == lowered}
+        topic_rows = set(self.topics.get(topic.lower(), ())) if topic is not None else None
+
+        return [
+            i
+            for i in order
+            if (language_ids is None or self.language[i] in language_ids)
+            and (is_fork is None or bool(self.is_fork[i]) == is_fork)
+            and (is_archived is None or bool(self.is_archived[i]) == is_archived)
+            and (topic_rows is None or i in topic_rows)
+        ]
+
+    def rows(self, indices: list[int]) -> list[GitHubRepository]:
+        return [self._row(i) for i in indices]
+
+    def stats(self) -> RepositoryStats:
+        language_repos = Counter(self.language)
+        language_stars: Counter[int] = Counter()
+        language_forks: Counter[int] = Counter()
+        for language_id, stars, forks in zip(self.language, self.stars, self.forks):
+            language_stars[language_id] += stars
+            language_forks[language_id] += forks
+
+        languages = [
+            LanguageStats(
+                language=self.languages[language_id] if language_id >= 0 else None,
+                repositories=count,
+                stars=language_stars[language_id],
+                forks=language_forks[language_id],
+            )
+            for language_id, count in language_repos.items()
+        ]
+        languages.sort(key=lambda item: (item.stars, item.repositories), reverse=True)
+
+        topics = [TopicStats(topic=topic, repositories=len(rows)) for topic, rows in self.topics.items()]
+        topics.sort(key=lambda item: item.repositories, reverse=True)
+
+        return RepositoryStats(
+            username=self.username,
+            total_repositories=len(self),
+            total_stars=sum(self.stars),
+            total_forks=sum(self.forks),
+            forked_repositories=sum(self.is_fork),
+            archived_repositories=sum(self.is_archived),
+            languages=languages,
+            topics=topics[:20],
+        )
+
+    def to_bytes(self) -> bytes:
+        """A JSON header, the columns' raw bytes, then the rows as a JSON array."""
+        if self._row_starts is None:
+            rows = [repo.model_dump_json().encode() for repo in self._rows]
+            row_json = b"[" + b",".join(rows) + b"]"
+            row_starts = array("q", [1])
+            for row in rows:
+                row_starts.append(row_starts[-1] + len(row) + 1)
+        else:
+            row_json, row_starts = self._row_json, self._row_starts
+        columns = [getattr(self, name).tobytes() for name in _COLUMNS] + [row_starts.tobytes()]
+        header = {
+            "username": self.username,
+            "languages": self.languages,
+            "topics": {topic: rows.tolist() for topic, rows in self.topics.items()},
+            "columns": [len(column) for column in columns],
+        }
+        return orjson.dumps(header) + b"\n" + b"".join(columns) + row_json
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "RepoIndex":
+        header_json, body = data.split(b"\n", 1)
+        header = orjson.loads(header_json)
+        index = cls.__new__(cls)
+        index.username = header["username"]
+        index.languages = header["languages"]
+        index.topics = {topic: array("i", rows) for topic, rows in header["topics"].items()}
+        offset = 0
+        for (name, typecode), length in zip([*_COLUMNS.items(), ("_row_starts", "q")], header["columns"]):
+            column = array(typecode)
+            column.frombytes(body[offset : offset + length])
+            setattr(index, name, column)
+            offset += length
+        index._row_json = body[offset:]
+        index._rows = [None] * (len(index._row_starts) - 1)
+        index._orders = {}
+        index._size = None
+        return index
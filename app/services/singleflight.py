@@ -0,0 +1,40 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one upstream fetch."""
+
+    def __init__(self):
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            self.coalesced += 1
+        # Shield so a disconnecting caller does not cancel the fetch for everyone else.
+        return await asyncio.shield(task)
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._inflight
+
+    def _done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "in_flight": len(self._inflight),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,104 @@
+import asyncio
+import time
+from dataclasses import dataclass
+
+from fastapi import HTTPException
+
+
+@dataclass
+class TokenBudget:
+    token: str
+    limit: int = 5000
+    remaining: int = 5000
+    reset_at: float = 0.0
+    requests: int = 0
+
+    @property
+    def label(self) -> str:
+        return f"...{self.token[-4:]}" if self.token else "anonymous"
+
+
+class TokenPool:
+    """Spread GitHub requests over several tokens by remaining rate-limit budget.
+
+    Budgets are learned from the ``X-RateLimit-*`` headers of every response. When
+    every token is exhausted, callers are parked until the earliest reset instead of
+    failing, unless that reset is more than ``max_wait`` seconds away. An empty
+    token list means unauthenticated requests with the anonymous budget.
+    """
+
+    def __init__(self, tokens: list[str], max_wait: float = 60):
+        if tokens:
+            self._budgets = [TokenBudget(token) for token in dict.fromkeys(tokens)]
+        else:
+            self._budgets = [TokenBudget("", limit=60, remaining=60)]
+        self._max_wait = max_wait
+        self.parked = 0
+
+    async def acquire(self) -> TokenBudget:
+        while True:
+            now = time.time()
+            self._reset_expired(now)
+
+            best = max(self._budgets, key=lambda b: b.remaining)
+            if best.remaining > 0:
+                # Reserve one request now; the response headers correct the estimate.
+                best.remaining -= 1
+                best.requests += 1
+                return best
+
+            for budget in self._budgets:
+                # Spent with no reset time from GitHub: wait a minute, as update() assumes, instead of forever.
+                if not budget.reset_at:
+                    budget.reset_at = now + 60
+            wait = min(b.reset_at for b in self._budgets) - now
+            if wait > self._max_wait:
+                raise HTTPException(status_code=429, detail="GitHub API rate limit exceeded")
+            self.parked += 1
+            await asyncio.sleep(max(wait, 0.1))
+
+    def release(self, budget: TokenBudget) -> None:
+        """Hand back a reservation from ``acquire()`` when no response came back to correct it."""
+        budget.remaining = min(budget.remaining + 1, budget.limit)
+
+    def _reset_expired(self, now: float) -> None:
+        for budget in self._budgets:
+            if budget.reset_at and now >= budget.reset_at:
+                budget.remaining = budget.limit
+                budget.reset_at = 0.0
+
+    def update(self, budget: TokenBudget, headers) -> None:
+        if "X-RateLimit-Limit" in headers:
+            budget.limit = int(headers["X-RateLimit-Limit"])
+        if "X-RateLimit-Remaining" in headers:
+            budget.remaining = int(headers["X-RateLimit-Remaining"])
+        if "X-RateLimit-Reset" in headers:
+            budget.reset_at = float(headers["X-RateLimit-Reset"])
+        elif budget.remaining <= 0 and not budget.reset_at:
+            budget.reset_at = time.time() + 60
+
+    def remaining(self) -> int:
+        return sum(budget.remaining for budget in self._budgets)
+
+    def requests(self) -> int:
+        return sum(budget.requests for budget in self._budgets)
+
+    def stats(self) -> list[dict]:
+        now = time.time()
+        # Report budgets whose window has passed as full, as the next acquire() will.
+        self._reset_expired(now)
+        return [
+            {
+                "token": budget.label,
+                "limit": budget.limit,
+                "remaining": budget.remaining,
+                "reset_in": max(budget.reset_at - now, 0.0),
+                "requests": budget.requests,
+            }
+            for budget in self._budgets
+        ]
+
+
+def build_token_pool(settings) -> TokenPool:
+    tokens = [settings.github_token, *settings.github_tokens.split(",")]
+    return TokenPool([token.strip() for token in tokens if token.strip()], max_wait=settings.github_token_max_wait)
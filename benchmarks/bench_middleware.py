@@ -0,0 +1,143 @@
+"""Measure per-request overhead of the RapidAPI secret check.
+
+Compares no check, the previous BaseHTTPMiddleware implementation and the
+current pure ASGI one on /health and on a cached /profile hit. Requests are
+driven straight through the ASGI app, so no socket or client time is included.
+
+Usage: python -m benchmarks.bench_middleware [--requests 5000]
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import Request, Response
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.config import settings
+from app.main import app
+from app.middleware.rapidapi import RapidAPIMiddleware
+from app.middleware.rate_limit import RateLimiter
+from app.models.profile import GitHubProfile
+from app.services.cache import TTLCache
+from app.services.cache_backends import MemoryCacheBackend
+from app.services.github_api import GitHubAPIClient
+from app.services.github_scraper import GitHubScraper
+from app.services.loader import CacheLoader
+from app.services.rendered import RenderedResponse
+from app.services.singleflight import SingleFlight
+from app.services.token_pool import TokenPool
+
+SECRET = "bench-secret"
+
+
+class BaseHTTPRapidAPIMiddleware(BaseHTTPMiddleware):
+    """The implementation this benchmark replaced, kept for comparison."""
+
+    async def dispatch(self, request: Request, call_next) -> Response:
+        if not settings.rapidapi_proxy_secret:
+            return await call_next(request)
+
+        proxy_secret = request.headers.get("X-RapidAPI-Proxy-Secret", "")
+        if proxy_secret != settings.rapidapi_proxy_secret:
+            return Response(content="Unauthorized", status_code=403)
+
+        return await call_next(request)
+
+
+VARIANTS = {
+    "none": None,
+    "base_http": BaseHTTPRapidAPIMiddleware,
+    "pure_asgi": RapidAPIMiddleware,
+}
+
+
+def use_middleware(cls) -> None:
+    stack = [m for m in app.user_middleware if m.cls not in VARIANTS.values()]
+    if cls is not None:
+        # Same position as in app.main: inside the metrics middleware, outside CORS.
+        stack.insert(1, type(app.user_middleware[0])(cls))
+    app.user_middleware = stack
+    app.middleware_stack = app.build_middleware_stack()
+
+
+async def setup_state() -> None:
+    client = httpx.AsyncClient()
+    app.state.api_http_client = app.state.web_http_client = client
+    app.state.token_pool = TokenPool([])
+    app.state.github_api = GitHubAPIClient(client, token_pool=app.state.token_pool)
+    app.state.github_scraper = GitHubScraper(client)
+    app.state.github_graphql = None
+    app.state.cache = MemoryCacheBackend(TTLCache(default_ttl=3600))
+    app.state.singleflight = SingleFlight()
+    app.state.loader = CacheLoader(app.state.cache, app.state.singleflight)
+    app.state.limiter = RateLimiter("1000000/minute", {})
+    profile = GitHubProfile(username="octocat", name="The Octocat", followers=10)
+    await app.state.cache.set("profile:octocat", RenderedResponse.of(profile))
+
+
+async def request(path: str) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench"), (b"x-rapidapi-proxy-secret", SECRET.encode())],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+        "app": app,
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def bench(path: str, requests: int) -> float:
+    for _ in range(100):
+        assert await request(path) == 200
+    start = time.perf_counter()
+    for _ in range(requests):
+        await request(path)
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+async def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--requests", type=int, default=5000)
+    args = arg_parser.parse_args()
+
+    settings.rapidapi_proxy_secret = SECRET
+    await setup_state()
+
+    print(f"{args.requests} requests per run, microseconds per request")
+    print(f"{'middleware':<12}{'/health':>10}{'/profile':>10}")
+    baseline = {}
+    for name, cls in VARIANTS.items():
+        use_middleware(cls)
+        health = await bench("/health", args.requests)
+        profile = await bench("/profile/octocat", args.requests)
+        baseline.setdefault("health", health)
+        baseline.setdefault("profile", profile)
+        print(
+            f"{name:<12}{health:>10.1f}{profile:>10.1f}"
+            f"   (+{health - baseline['health']:.1f} / +{profile - baseline['profile']:.1f})"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
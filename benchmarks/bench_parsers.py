@@ -0,0 +1,71 @@
+"""Compare profile parser backends on the fixture page padded to a realistic size.
+
+Usage: python -m benchmarks.bench_parsers [--size-kb 250] [--repeat 50]
+"""
+
+import argparse
+import time
+import tracemalloc
+from pathlib import Path
+
+from app.services.profile_parsers import PARSERS
+
+FIXTURE = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "profile.html"
+
+FILLER = (
+    '<div class="TimelineItem"><div class="TimelineItem-badge"><svg class="octicon" height="16"><path d="M1 2"></path>'
+    '</svg></div><div class="TimelineItem-body"><a class="Link--primary" href="/octocat/repo">octocat/repo</a>'
+    '<span class="color-fg-muted f6">Created 3 commits in 1 repository</span><ul class="list-style-none">'
+    '<li class="d-flex"><a href="/octocat/repo/commits">3 commits</a></li></ul></div></div>\n'
+)
+
+
+def build_page(size_kb: int) -> bytes:
+    page = FIXTURE.read_text()
+    padding = FILLER * max(0, (size_kb * 1024 - len(page)) // len(FILLER))
+    return page.replace("</main>", padding + "</main>").encode()
+
+
+def bench(name: str, html: bytes, repeat: int) -> dict:
+    parser = PARSERS[name]()
+    parser.parse(html)
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parser.parse(html)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    parser.parse(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "parser": name,
+        "median_ms": timings[len(timings) // 2] * 1000,
+        "min_ms": timings[0] * 1000,
+        "python_peak_kb": peak / 1024,
+    }
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--size-kb", type=int, default=250)
+    arg_parser.add_argument("--repeat", type=int, default=50)
+    args = arg_parser.parse_args()
+
+    html = build_page(args.size_kb)
+    outputs = {name: PARSERS[name]().parse(html) for name in PARSERS}
+    assert all(output == outputs["bs4"] for output in outputs.values()), "parser outputs differ"
+
+    print(f"page size: {len(html) / 1024:.0f} KB, {args.repeat} runs")
+    print(f"{'parser':<8}{'median ms':>12}{'min ms':>10}{'py peak KB':>12}")
+    for name in PARSERS:
+        result = bench(name, html, args.repeat)
+        print(f"{name:<8}{result['median_ms']:>12.2f}{result['min_ms']:>10.2f}{result['python_peak_kb']:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
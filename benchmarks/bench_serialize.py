@@ -0,0 +1,94 @@
+"""Compare ways of turning a page of GitHub repository JSON into response bytes.
+
+  response_model   validated models returned from the route: FastAPI validates them
+                   again against response_model, runs jsonable_encoder and json.dumps
+  model_dump_json  validated models serialized by pydantic-core (the previous path)
+  fast_path        upstream dicts mapped once to the response shape, rendered with orjson
+
+All three produce the same JSON; the script checks that before timing.
+
+Usage: python -m benchmarks.bench_serialize [--repos 100] [--repeat 500]
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import time
+from pathlib import Path
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.models.repository import GitHubRepository, RepositoriesResponse
+from app.routers.repositories import _repository_row
+from app.services.rendered import RenderedResponse
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+RESPONSE_FIELD = create_model_field("Response_get_repositories", RepositoriesResponse, mode="serialization")
+
+
+def upstream_page(count: int) -> list[dict]:
+    template = json.loads((FIXTURES / "repo.json").read_text())
+    page = []
+    for i in range(count):
+        repo = copy.deepcopy(template)
+        repo.update(name=f"project-{i:04d}", full_name=f"octocat/project-{i:04d}", stargazers_count=i * 37)
+        page.append(repo)
+    return page
+
+
+def validated(page: list[dict]) -> RepositoriesResponse:
+    return RepositoriesResponse(
+        username="octocat",
+        total_count=len(page),
+        page=1,
+        per_page=100,
+        repositories=[GitHubRepository(**_repository_row(r)) for r in page],
+    )
+
+
+async def response_model(page: list[dict]) -> bytes:
+    content = await serialize_response(field=RESPONSE_FIELD, response_content=validated(page))
+    return JSONResponse(content).body
+
+
+async def model_dump_json(page: list[dict]) -> bytes:
+    return RenderedResponse.of(validated(page)).body
+
+
+async def fast_path(page: list[dict]) -> bytes:
+    rows = [_repository_row(r) for r in page]
+    content = {"username": "octocat", "total_count": len(rows), "page": 1, "per_page": 100, "repositories": rows}
+    return RenderedResponse.render(RepositoriesResponse, content).body
+
+
+VARIANTS = {"response_model": response_model, "model_dump_json": model_dump_json, "fast_path": fast_path}
+
+
+async def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--repos", type=int, default=100)
+    arg_parser.add_argument("--repeat", type=int, default=500)
+    args = arg_parser.parse_args()
+
+    page = upstream_page(args.repos)
+    outputs = {name: await variant(page) for name, variant in VARIANTS.items()}
+    assert len({json.dumps(json.loads(body)) for body in outputs.values()}) == 1, "variants disagree"
+    assert outputs["fast_path"] == outputs["model_dump_json"], "fast path bytes differ from pydantic's"
+
+    print(f"{args.repos} repositories, {len(outputs['fast_path'])} bytes, {args.repeat} runs")
+    print(f"{'variant':<18}{'us/response':>12}{'speedup':>9}")
+    baseline = None
+    for name, variant in VARIANTS.items():
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            await variant(page)
+        elapsed = (time.perf_counter() - start) / args.repeat * 1_000_000
+        baseline = baseline or elapsed
+        print(f"{name:<18}{elapsed:>12.0f}{baseline / elapsed:>8.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,192 @@
+"""Local stand-in for api.github.com and github.com.
+
+Serves user JSON, repository pages and profile HTML built from the test
+fixtures for any username, with configurable latency and failure modes.
+Point the app at it with GITHUB_API_URL / GITHUB_WEB_URL.
+
+Usernames select behaviour: ``missing-*`` is a 404 and ``heavy-*`` gets a
+large profile page whose padding comes before the contribution section, so
+the scraper has to download and parse all of it.
+
+Usage: python -m benchmarks.github_stub [--port 8901] [--latency-ms 20] [--error-rate 0.01]
+"""
+
+import argparse
+import asyncio
+import copy
+import hashlib
+import json
+import random
+import time
+from collections import Counter
+from pathlib import Path
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from benchmarks.bench_parsers import FILLER, FIXTURE
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+CONTRIBUTIONS_SECTION = '<div class="js-yearly-contributions">'
+
+
+def build_profile_page(size_kb: int, before_contributions: bool = False) -> bytes:
+    page = FIXTURE.read_text()
+    padding = FILLER * max(0, (size_kb * 1024 - len(page)) // len(FILLER))
+    if before_contributions:
+        return page.replace(CONTRIBUTIONS_SECTION, padding + CONTRIBUTIONS_SECTION).encode()
+    return page.replace("</main>", padding + "</main>").encode()
+
+
+class GitHubStub:
+    def __init__(
+        self,
+        latency_ms: float = 20,
+        jitter_ms: float = 0,
+        repos: int = 42,
+        page_kb: int = 250,
+        heavy_page_kb: int = 1000,
+        error_rate: float = 0.0,
+        rate_limit_every: int = 0,
+        not_modified: bool = True,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.repo_count = repos
+        self.error_rate = error_rate
+        self.rate_limit_every = rate_limit_every
+        self.not_modified = not_modified
+        self.user_template = json.loads((FIXTURES / "user.json").read_text())
+        self.repo_template = json.loads((FIXTURES / "repo.json").read_text())
+        self.page = build_profile_page(page_kb)
+        self.heavy_page = build_profile_page(heavy_page_kb, before_contributions=True)
+        self.counts: Counter[str] = Counter()
+        self._api_requests = 0
+
+    async def _delay(self) -> None:
+        delay = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+    def _failure(self) -> Response | None:
+        self._api_requests += 1
+        if self.rate_limit_every and self._api_requests % self.rate_limit_every == 0:
+            self.counts["rate_limited"] += 1
+            return JSONResponse(
+                {"message": "API rate limit exceeded"},
+                status_code=403,
+                headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int(time.time()) + 1)},
+            )
+        if self.error_rate and random.random() < self.error_rate:
+            self.counts["errors"] += 1
+            return JSONResponse({"message": "Server Error"}, status_code=502)
+        return None
+
+    def _json(self, request: Request, data) -> Response:
+        body = json.dumps(data).encode()
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        headers = {
+            "ETag": etag,
+            "X-RateLimit-Limit": "5000",
+            "X-RateLimit-Remaining": "4999",
+            "X-RateLimit-Reset": str(int(time.time()) + 3600),
+        }
+        if self.not_modified and request.headers.get("if-none-match") == etag:
+            self.counts["not_modified"] += 1
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type="application/json", headers=headers)
+
+    async def user(self, request: Request) -> Response:
+        self.counts["user"] += 1
+        await self._delay()
+        username = request.path_params["username"]
+        if failure := self._failure():
+            return failure
+        if username.startswith("missing-"):
+            return JSONResponse({"message": "Not Found"}, status_code=404)
+        user = dict(self.user_template, login=username, name=username.title(), public_repos=self.repo_count)
+        return self._json(request, user)
+
+    async def repos(self, request: Request) -> Response:
+        self.counts["repos"] += 1
+        await self._delay()
+        username = request.path_params["username"]
+        if failure := self._failure():
+            return failure
+        if username.startswith("missing-"):
+            return JSONResponse({"message": "Not Found"}, status_code=404)
+
+        page = int(request.query_params.get("page", 1))
+        per_page = int(request.query_params.get("per_page", 30))
+        start = (page - 1) * per_page
+        repos = []
+        for i in range(start, min(start + per_page, self.repo_count)):
+            repo = copy.deepcopy(self.repo_template)
+            name = f"project-{i:04d}"
+            repo.update(
+                name=name,
+                full_name=f"{username}/{name}",
+                html_url=f"https://github.com/{username}/{name}",
+                stargazers_count=(i * 37) % 500,
+                forks_count=(i * 11) % 50,
+                fork=i % 7 == 0,
+                language=("Python", "Go", "Rust", None)[i % 4],
+            )
+            repos.append(repo)
+        return self._json(request, repos)
+
+    async def profile_page(self, request: Request) -> Response:
+        self.counts["profile_page"] += 1
+        await self._delay()
+        username = request.path_params["username"]
+        if username.startswith("missing-"):
+            return Response("Not Found", status_code=404)
+        page = self.heavy_page if username.startswith("heavy-") else self.page
+        return Response(page, media_type="text/html; charset=utf-8")
+
+    async def stats(self, request: Request) -> Response:
+        return JSONResponse(dict(self.counts))
+
+    def app(self) -> Starlette:
+        return Starlette(
+            routes=[
+                Route("/_stub/stats", self.stats),
+                Route("/users/{username}", self.user),
+                Route("/users/{username}/repos", self.repos),
+                Route("/{username}", self.profile_page),
+            ]
+        )
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8901)
+    arg_parser.add_argument("--latency-ms", type=float, default=20)
+    arg_parser.add_argument("--jitter-ms", type=float, default=0)
+    arg_parser.add_argument("--repos", type=int, default=42, help="public repositories per user")
+    arg_parser.add_argument("--page-kb", type=int, default=250)
+    arg_parser.add_argument("--heavy-page-kb", type=int, default=1000)
+    arg_parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of API requests answered with 502")
+    arg_parser.add_argument("--rate-limit-every", type=int, default=0, help="answer every Nth API request with a 403 rate limit")
+    arg_parser.add_argument("--no-304", action="store_true", help="ignore If-None-Match")
+    args = arg_parser.parse_args()
+
+    stub = GitHubStub(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        repos=args.repos,
+        page_kb=args.page_kb,
+        heavy_page_kb=args.heavy_page_kb,
+        error_rate=args.error_rate,
+        rate_limit_every=args.rate_limit_every,
+        not_modified=not args.no_304,
+    )
+    uvicorn.run(stub.app(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
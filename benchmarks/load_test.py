@@ -0,0 +1,206 @@
+"""Drive the app against the local GitHub stub and report throughput, latency and memory.
+
+Scenarios:
+  cold          every request is a new user: REST + scrape + parse on each one
+  warm          a few users, cache populated beforehand: cache hits only
+  scrape_heavy  new users with large profile pages that have to be read in full
+
+Each scenario runs with fresh app state. Results can be saved as a JSON
+baseline and later runs compared against it; a regression beyond the
+tolerance makes the command exit non-zero.
+
+Usage:
+  python -m benchmarks.load_test [--concurrency 32] [--requests 500] [--save benchmarks/baseline.json]
+  python -m benchmarks.load_test --compare benchmarks/baseline.json [--tolerance 0.25]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+SCENARIOS = ("cold", "warm", "scrape_heavy")
+WARM_USERS = 10
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def start_stub(port: int, args: argparse.Namespace) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "benchmarks.github_stub",
+            "--port", str(port),
+            "--latency-ms", str(args.latency_ms),
+            "--error-rate", str(args.error_rate),
+        ],
+        cwd=Path(__file__).resolve().parent.parent,
+    )
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/_stub/stats", timeout=0.5)
+            return process
+        except httpx.TransportError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("GitHub stub did not start")
+
+
+def paths(scenario: str, requests: int, run: int) -> list[str]:
+    result = []
+    for i in range(requests):
+        if scenario == "warm":
+            user = f"warm-{i % WARM_USERS}"
+        elif scenario == "scrape_heavy":
+            user = f"heavy-{run}-{i}"
+        else:
+            user = f"cold-{run}-{i}"
+        # Profiles dominate real traffic; every fourth request lists repositories.
+        result.append(f"/repos/{user}" if scenario != "scrape_heavy" and i % 4 == 3 else f"/profile/{user}")
+    return result
+
+
+async def drive(client: httpx.AsyncClient, urls: list[str], concurrency: int) -> tuple[list[float], int, float]:
+    queue: asyncio.Queue[str] = asyncio.Queue()
+    for url in urls:
+        queue.put_nowait(url)
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        while not queue.empty():
+            url = queue.get_nowait()
+            started_at = time.perf_counter()
+            resp = await client.get(url)
+            latencies.append(time.perf_counter() - started_at)
+            if resp.status_code != 200:
+                errors += 1
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started_at
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def run_scenario(scenario: str, args: argparse.Namespace, run: int) -> dict:
+    from app.main import app, lifespan
+
+    async with lifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            if scenario == "warm":
+                await drive(client, [f"/profile/warm-{i}" for i in range(WARM_USERS)] + [f"/repos/warm-{i}" for i in range(WARM_USERS)], WARM_USERS)
+            rss_before = rss_mb()
+            latencies, errors, elapsed = await drive(client, paths(scenario, args.requests, run), args.concurrency)
+            rss_after = rss_mb()
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "rss_mb": rss_after,
+        "rss_growth_mb": rss_after - rss_before,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for scenario, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(scenario)
+        if previous is None:
+            continue
+        if current["rps"] < previous["rps"] * (1 - tolerance):
+            regressions.append(f"{scenario}: rps {previous['rps']:.0f} -> {current['rps']:.0f}")
+        if current["p99_ms"] > previous["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{scenario}: p99 {previous['p99_ms']:.1f}ms -> {current['p99_ms']:.1f}ms")
+    return regressions
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    arg_parser.add_argument("--concurrency", type=int, default=32)
+    arg_parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    arg_parser.add_argument("--latency-ms", type=float, default=20, help="stub latency per upstream request")
+    arg_parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of stub API requests that fail")
+    arg_parser.add_argument("--save", type=Path, help="write results to this JSON file")
+    arg_parser.add_argument("--compare", type=Path, help="compare with a saved baseline")
+    arg_parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    args = arg_parser.parse_args()
+
+    port = free_port()
+    stub = start_stub(port, args)
+    # Settings are read at import time, so configure the app before importing it.
+    os.environ.update(
+        GITHUB_API_URL=f"http://127.0.0.1:{port}",
+        GITHUB_WEB_URL=f"http://127.0.0.1:{port}",
+        HTTP2_ENABLED="false",
+        RATE_LIMIT="1000000/minute",
+        RAPIDAPI_PROXY_SECRET="",
+        CACHE_BACKEND="memory",
+    )
+    try:
+        results = {
+            "meta": {
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "concurrency": args.concurrency,
+                "requests": args.requests,
+                "stub_latency_ms": args.latency_ms,
+            },
+            "scenarios": {},
+        }
+        print(f"{args.requests} requests per scenario, concurrency {args.concurrency}, stub latency {args.latency_ms}ms")
+        print(f"{'scenario':<14}{'rps':>9}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}{'rss MB':>9}")
+        for run, scenario in enumerate(args.scenarios.split(",")):
+            result = asyncio.run(run_scenario(scenario, args, run))
+            results["scenarios"][scenario] = result
+            print(
+                f"{scenario:<14}{result['rps']:>9.0f}{result['p50_ms']:>9.1f}{result['p99_ms']:>9.1f}"
+                f"{result['errors']:>8}{result['rss_mb']:>9.0f}"
+            )
+        print("stub requests:", httpx.get(f"http://127.0.0.1:{port}/_stub/stats").json())
+    finally:
+        stub.terminate()
+        stub.wait()
+
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2) + "\n")
+    if args.compare:
+        regressions = compare(results, json.loads(args.compare.read_text()), args.tolerance)
+        for regression in regressions:
+            print("REGRESSION", regression)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
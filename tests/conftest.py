@@ -1,19 +1,31 @@
 import httpx
 import pytest
 
+from app.config import settings
 from app.main import app
+from app.middleware.rate_limit import RateLimiter
 from app.services.cache import TTLCache
+from app.services.cache_backends import MemoryCacheBackend
 from app.services.github_api import GitHubAPIClient
 from app.services.github_scraper import GitHubScraper
+from app.services.loader import CacheLoader
+from app.services.singleflight import SingleFlight
+from app.services.token_pool import TokenPool
 
 
 @pytest.fixture(autouse=True)
 def setup_app_state():
     """Initialize app state that normally comes from lifespan."""
     client = httpx.AsyncClient(timeout=30.0)
-    app.state.http_client = client
-    app.state.github_api = GitHubAPIClient(client)
+    app.state.api_http_client = client
+    app.state.web_http_client = client
+    app.state.token_pool = TokenPool([])
+    app.state.github_api = GitHubAPIClient(client, token_pool=app.state.token_pool)
     app.state.github_scraper = GitHubScraper(client)
-    app.state.cache = TTLCache(default_ttl=300)
+    app.state.github_graphql = None
+    app.state.cache = MemoryCacheBackend(TTLCache(default_ttl=300))
+    app.state.singleflight = SingleFlight()
+    app.state.loader = CacheLoader(app.state.cache, app.state.singleflight)
+    app.state.limiter = RateLimiter(settings.rate_limit, {})
+    app.state.prefetch = None
     yield
-    app.state.cache.clear()
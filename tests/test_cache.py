@@ -0,0 +1,207 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.profile import GitHubProfile
+from app.models.repository import GitHubRepository
+from app.services.cache import TTLCache
+from app.services.cache_backends import MemoryCacheBackend, RedisCacheBackend, SnapshotCacheBackend, TieredCacheBackend, decode, encode
+from app.services.loader import CacheLoader
+from app.services.rendered import RenderedResponse
+from app.services.repo_index import RepoIndex
+from app.services.singleflight import SingleFlight
+
+
+def test_lru_eviction_by_entry_count():
+    cache = TTLCache(default_ttl=300, max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_budget_and_sweep():
+    cache = TTLCache(default_ttl=300, max_bytes=10)
+    cache.set("a", b"12345")
+    cache.set("b", b"12345")
+    cache.set("c", b"12345")
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["bytes"] == 10
+
+    cache.set("d", b"1", ttl=-1)
+    assert cache.sweep(time.time()) == 1
+    assert cache.get("d") is None
+
+    cache.set("b", b"12345678901")
+    assert cache.get("b") is None
+    assert cache.stats()["bytes"] == 5
+
+
+def test_rendered_response_size_includes_compressed_variants():
+    cache = TTLCache(default_ttl=300)
+    rendered = RenderedResponse.of(GitHubProfile(username="octocat", name="x" * 1000))
+    cache.set("profile:octocat", rendered)
+    before = cache.stats()["bytes"]
+
+    rendered.encoded("gzip")
+    assert cache.get("profile:octocat") is rendered
+    assert cache.stats()["bytes"] == before + len(rendered.encoded("gzip"))
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_served_while_refreshing():
+    cache = TTLCache(default_ttl=300, stale_ttl=300)
+    loader = CacheLoader(MemoryCacheBackend(cache), SingleFlight())
+    cache.set("profile:octocat", "old", ttl=-1)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "new"
+
+    assert await loader.load("profile:octocat", fetch) == "old"
+    assert await loader.load("profile:octocat", fetch) == "old"
+    await asyncio.sleep(0.05)
+
+    assert calls == 1
+    assert await loader.load("profile:octocat", fetch) == "new"
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_kept_when_refresh_fails_upstream():
+    cache = TTLCache(default_ttl=300, stale_ttl=300)
+    loader = CacheLoader(MemoryCacheBackend(cache), SingleFlight())
+    cache.set("profile:octocat", "old", ttl=-290)
+
+    async def fetch():
+        raise HTTPException(status_code=502, detail="GitHub API error")
+
+    assert await loader.load("profile:octocat", fetch) == "old"
+    await asyncio.sleep(0.01)
+
+    assert loader.stats()["stale_kept"] == 1
+    _, soft_expires_at, hard_expires_at = cache.peek("profile:octocat")
+    assert soft_expires_at <= time.time() < hard_expires_at - 290
+    assert await loader.load("profile:octocat", fetch) == "old"
+
+
+def test_repo_index_is_stored_in_columnar_form():
+    index = RepoIndex(
+        "octocat",
+        [
+            GitHubRepository(
+                name=f"repo-{i}",
+                full_name=f"octocat/repo-{i}",
+                html_url=f"https://github.com/octocat/repo-{i}",
+                language=["Go", "C", None][i % 3],
+                topics=["api", "CLI"][: i % 3],
+                stars=i * 10,
+                is_fork=i % 2 == 0,
+                pushed_at=f"2024-01-{i + 1:02d}T00:00:00Z",
+            )
+            for i in range(9)
+        ],
+    )
+
+    restored = decode(encode(index))
+
+    assert isinstance(restored, RepoIndex)
+    top = restored.query("stars")[:2]
+    assert restored.rows(top) == index.rows(top)
+    # Only the rows asked for were parsed.
+    assert sum(row is not None for row in restored._rows) == 2
+    assert restored.repositories == index.repositories
+    assert (restored.stars, restored.language, restored.is_fork, restored.pushed) == (
+        index.stars,
+        index.language,
+        index.is_fork,
+        index.pushed,
+    )
+    assert restored.topics == index.topics
+    assert restored.query("pushed", language="go", is_fork=False) == index.query("pushed", language="go", is_fork=False)
+    assert restored.stats() == index.stats()
+
+
+@pytest.mark.asyncio
+async def test_tiered_backend_shares_l2_between_workers():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    workers = [
+        TieredCacheBackend(
+            MemoryCacheBackend(TTLCache(default_ttl=10)),
+            RedisCacheBackend(fakeredis.FakeAsyncRedis(server=server), default_ttl=300, stale_ttl=300),
+        )
+        for _ in range(2)
+    ]
+    profile = GitHubProfile(username="octocat", followers=42)
+
+    await workers[0].set("profile:octocat", profile)
+    value, stale = await workers[1].get_entry("profile:octocat")
+
+    assert value == profile
+    assert not stale
+    assert workers[1].stats()["l2_hits"] == 1
+    assert await workers[1].get_entry("profile:octocat") == (profile, False)
+    assert workers[1].stats()["l1_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_outage_falls_back_to_upstream():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    server.connected = False
+    cache = RedisCacheBackend(fakeredis.FakeAsyncRedis(server=server), default_ttl=300)
+    loader = CacheLoader(cache, SingleFlight())
+
+    profile = GitHubProfile(username="octocat")
+
+    async def fetch():
+        return profile
+
+    assert await loader.load("profile:octocat", fetch) == profile
+    assert await cache.ttl_remaining("profile:octocat") is None
+    assert cache.stats()["errors"] == 3
+
+
+@pytest.mark.asyncio
+async def test_snapshot_backend_restores_valid_entries_lazily(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+
+    def backend(default_ttl: int = 300) -> SnapshotCacheBackend:
+        cache = TTLCache(default_ttl=default_ttl, stale_ttl=60)
+        return SnapshotCacheBackend(MemoryCacheBackend(cache), cache, path)
+
+    before = backend()
+    profile = GitHubProfile(username="octocat", followers=42)
+    await before.set("profile:octocat", profile)
+    await before.set("profile:gone", GitHubProfile(username="gone"), ttl=-120)
+    await before.close()
+
+    after = backend()
+    assert after.stats()["entries"] == 0
+    assert 299 < await after.ttl_remaining("profile:octocat") <= 300
+    assert await after.get_entry("profile:octocat") == (profile, False)
+    assert await after.get_entry("profile:gone") is None
+    assert after.stats()["snapshot_loaded"] == 1
+    assert after.stats()["entries"] == 1
+
+    # A key found missing is not looked up again until a snapshot saves it.
+    with patch.object(after, "_read", wraps=after._read) as read:
+        assert await after.get_entry("profile:new") is None
+        assert await after.ttl_remaining("profile:new") is None
+        await after.set("profile:new", GitHubProfile(username="new"))
+        await after.snapshot()
+        after._cache.clear()
+        assert await after.get_entry("profile:new") == (GitHubProfile(username="new"), False)
+    assert [c.args for c in read.call_args_list] == [("profile:new",), ("profile:new",)]
+    await after.close()
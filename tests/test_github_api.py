@@ -0,0 +1,126 @@
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.github_api import GitHubAPIClient
+from app.services.token_pool import TokenPool
+
+
+@pytest.mark.asyncio
+async def test_conditional_request_serves_stored_body_on_304():
+    seen_etags = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen_etags.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"abc"':
+            return httpx.Response(304)
+        return httpx.Response(200, json={"login": "octocat"}, headers={"ETag": '"abc"'})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        api = GitHubAPIClient(client)
+        first = await api.get_user("octocat")
+        second = await api.get_user("octocat")
+
+    assert first == second == {"login": "octocat"}
+    assert seen_etags == [None, '"abc"']
+    assert api.stats()["not_modified"] == 1
+
+
+@pytest.mark.asyncio
+async def test_exhausted_token_falls_over_to_the_next_one():
+    used_tokens = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        token = request.headers["Authorization"].removeprefix("Bearer ")
+        used_tokens.append(token)
+        if token == "token-a":
+            return httpx.Response(403, headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "9999999999"})
+        return httpx.Response(200, json={"login": "octocat"}, headers={"X-RateLimit-Remaining": "4999"})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        api = GitHubAPIClient(client, token_pool=TokenPool(["token-a", "token-b"]))
+        assert await api.get_user("octocat") == {"login": "octocat"}
+        assert await api.get_user("octocat") == {"login": "octocat"}
+
+    assert used_tokens == ["token-a", "token-b", "token-b"]
+    assert [budget["remaining"] for budget in api.token_stats()] == [0, 4999]
+
+
+@pytest.mark.asyncio
+async def test_breaker_fails_fast_after_repeated_upstream_errors():
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(502)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        api = GitHubAPIClient(client, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+        for _ in range(2):
+            with pytest.raises(HTTPException) as exc_info:
+                await api.get_user("octocat")
+            assert exc_info.value.status_code == 502
+        with pytest.raises(HTTPException) as exc_info:
+            await api.get_user("octocat")
+
+    assert exc_info.value.status_code == 503
+    assert calls == 2
+    assert api.breaker.stats()["open"] == 1
+    assert api.breaker.stats()["rejected"] == 1
+
+
+def test_half_open_probe_closes_breaker_or_doubles_open_period():
+    now = 1000.0
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, max_reset_timeout=30)
+    with patch("app.services.circuit_breaker.time.monotonic", side_effect=lambda: now):
+        breaker.record_failure()
+        assert not breaker.allow()
+
+        now += 10
+        assert breaker.allow()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        breaker.record_failure()
+        assert breaker.stats()["open_for"] == 20
+        now += 19
+        assert not breaker.allow()
+
+        now += 1
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.stats()["open_for"] == 30
+
+        now += 30
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.stats() == {"open": 0, "open_for": 0.0, "trips": 3, "rejected": 2}
+        breaker.record_failure()
+        assert breaker.stats()["open_for"] == 10
+
+
+@pytest.mark.asyncio
+async def test_transport_errors_do_not_drain_the_token_budget():
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("connection refused")
+
+    pool = TokenPool([])
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        api = GitHubAPIClient(client, token_pool=pool, breaker=CircuitBreaker(failure_threshold=1000))
+        for _ in range(70):
+            with pytest.raises(HTTPException) as exc_info:
+                await api.get_user("octocat")
+            assert exc_info.value.status_code == 502
+
+    assert pool.remaining() == 60
+
+    # A budget spent without any reset time parks callers for a bounded time, not forever.
+    exhausted = TokenPool([], max_wait=10)
+    exhausted._budgets[0].remaining = 0
+    with pytest.raises(HTTPException) as exc_info:
+        await asyncio.wait_for(exhausted.acquire(), 1)
+    assert exc_info.value.status_code == 429
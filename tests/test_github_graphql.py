@@ -0,0 +1,94 @@
+import asyncio
+import json
+
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.main import app
+from app.services.github_graphql import GitHubGraphQLClient
+from app.services.token_pool import TokenPool
+
+
+def graphql_user(login: str) -> dict:
+    return {
+        "login": login,
+        "name": login.title(),
+        "bio": None,
+        "avatarUrl": None,
+        "location": None,
+        "company": None,
+        "websiteUrl": None,
+        "twitterUsername": None,
+        "email": "",
+        "createdAt": "2020-01-01T00:00:00Z",
+        "updatedAt": "2024-01-01T00:00:00Z",
+        "repositories": {"totalCount": 3},
+        "gists": {"totalCount": 1},
+        "followers": {"totalCount": 10},
+        "following": {"totalCount": 2},
+        "pinnedItems": {"nodes": [{"name": "hello", "description": None, "primaryLanguage": {"name": "Go"}, "stargazerCount": 7}]},
+        "contributionsCollection": {"contributionCalendar": {"totalContributions": 123}},
+    }
+
+
+@pytest.mark.asyncio
+async def test_concurrent_profiles_are_batched_into_one_query():
+    queries = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        variables = json.loads(request.content)["variables"]
+        queries.append(variables)
+        data = {alias: graphql_user(login) if login != "ghost" else None for alias, login in variables.items()}
+        return httpx.Response(200, json={"data": data})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        graphql = GitHubGraphQLClient(client, TokenPool(["token"]))
+        results = await asyncio.gather(
+            graphql.get_profile("alice"),
+            graphql.get_profile("bob"),
+            graphql.get_profile("ghost"),
+            return_exceptions=True,
+        )
+
+    assert len(queries) == 1
+    api_data, scraped_data = results[0]
+    assert api_data["login"] == "alice"
+    assert api_data["public_repos"] == 3
+    assert scraped_data["pinned_repos"][0]["language"] == "Go"
+    assert scraped_data["contribution_stats"]["total_contributions_last_year"] == 123
+    assert results[1][0]["login"] == "bob"
+    assert results[2] is None
+
+
+@pytest.mark.asyncio
+async def test_graphql_profiles_keep_achievements_and_fall_back_to_rest_for_orgs():
+    def handler(request: httpx.Request) -> httpx.Response:
+        variables = json.loads(request.content)["variables"]
+        data = {alias: graphql_user(login) if login == "alice" else None for alias, login in variables.items()}
+        return httpx.Response(200, json={"data": data})
+
+    scraped = {"pinned_repos": [], "contribution_stats": None, "achievements": ["Starstruck"]}
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as graphql_client:
+        app.state.github_graphql = GitHubGraphQLClient(graphql_client, TokenPool(["token"]))
+        with (
+            patch("app.services.github_scraper.GitHubScraper.scrape_profile", new_callable=AsyncMock, return_value=scraped),
+            patch(
+                "app.services.github_api.GitHubAPIClient.get_user",
+                new_callable=AsyncMock,
+                return_value={"login": "github", "public_repos": 500},
+            ) as get_user,
+        ):
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as client:
+                user = await client.get("/profile/alice")
+                org = await client.get("/profile/github")
+
+    assert user.json()["achievements"] == ["Starstruck"]
+    assert user.json()["contribution_stats"] == {"total_contributions_last_year": 123}
+    assert org.status_code == 200
+    assert org.json()["username"] == "github"
+    assert org.json()["public_repos"] == 500
+    get_user.assert_awaited_once_with("github")
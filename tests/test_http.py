@@ -0,0 +1,25 @@
+import pytest
+
+from app.config import Settings
+from app.services.http import build_http_clients, pool_stats
+
+
+@pytest.mark.asyncio
+async def test_http_clients_use_per_service_settings():
+    settings = Settings(
+        http_max_connections=7,
+        http2_enabled=False,
+        github_api_read_timeout=3.0,
+        github_web_read_timeout=9.0,
+        github_web_pool_timeout=1.5,
+    )
+    api_client, web_client = build_http_clients(settings)
+    try:
+        assert api_client.timeout.read == 3.0
+        assert web_client.timeout.read == 9.0
+        assert web_client.timeout.pool == 1.5
+        assert api_client is not web_client
+        assert pool_stats(api_client) == {"connections": 0, "idle": 0, "in_use": 0, "queued": 0, "max_connections": 7}
+    finally:
+        await api_client.aclose()
+        await web_client.aclose()
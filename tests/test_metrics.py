@@ -0,0 +1,55 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.main import app
+from app.services.github_api import GitHubAPIClient
+from app.services.token_pool import TokenPool
+
+
+@pytest.mark.asyncio
+async def test_metrics_report_route_latency_stages_and_cache_counters():
+    with (
+        patch("app.services.github_api.GitHubAPIClient.get_user", new_callable=AsyncMock) as mock_api,
+        patch("app.services.github_scraper.GitHubScraper.scrape_profile", new_callable=AsyncMock) as mock_scraper,
+    ):
+        mock_api.return_value = {"login": "metricsuser"}
+        mock_scraper.return_value = {"pinned_repos": [], "contribution_stats": None, "achievements": []}
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.get("/profile/metricsuser")
+            await client.get("/profile/metricsuser")
+            resp = await client.get("/metrics")
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    body = resp.text
+    assert 'ghp_request_duration_seconds_count{method="GET",route="/profile/{username}",status="200"}' in body
+    assert 'ghp_stage_duration_seconds_count{stage="model_build"}' in body
+    assert 'ghp_stage_duration_seconds_count{stage="serialize"}' in body
+    assert "ghp_cache_hits_total 1.0" in body
+    assert "ghp_cache_misses_total 1.0" in body
+    assert 'ghp_github_ratelimit_remaining{token="anonymous"}' in body
+    assert 'ghp_http_pool_connections{pool="api"} 0.0' in body
+
+
+@pytest.mark.asyncio
+async def test_metrics_group_each_family_under_one_header():
+    app.state.github_api = GitHubAPIClient(app.state.api_http_client, token_pool=TokenPool(["token-aaaa", "token-bbbb"]))
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get("/metrics")
+
+    families = []
+    for line in resp.text.splitlines():
+        if line.startswith("# HELP "):
+            families.append(line.split()[2])
+        elif not line.startswith("#"):
+            name = line.split("{")[0].split()[0]
+            family = families[-1]
+            assert name == family or name.startswith(family + "_"), f"{name} outside its family {family}"
+    assert len(families) == len(set(families))
+    assert resp.text.count("# TYPE ghp_github_ratelimit_remaining gauge") == 1
+    assert 'ghp_github_ratelimit_remaining{token="...bbbb"}' in resp.text
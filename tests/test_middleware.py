@@ -0,0 +1,42 @@
+from unittest.mock import patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.main import app
+from app.middleware.rate_limit import RateLimiter
+
+
+@pytest.mark.asyncio
+async def test_rapidapi_secret_is_required_when_configured():
+    with patch("app.middleware.rapidapi.settings.rapidapi_proxy_secret", "s3cret"):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            missing = await client.get("/health")
+            wrong = await client.get("/health", headers={"X-RapidAPI-Proxy-Secret": "nope"})
+            ok = await client.get("/health", headers={"X-RapidAPI-Proxy-Secret": "s3cret"})
+
+    assert missing.status_code == 403
+    assert missing.text == "Unauthorized"
+    assert wrong.status_code == 403
+    assert ok.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_keys_on_rapidapi_user_and_plan():
+    app.state.limiter = RateLimiter("2/minute", {"PRO": "4/minute"})
+
+    async def statuses(client: AsyncClient, user: str, plan: str, count: int) -> list[int]:
+        headers = {"X-RapidAPI-Proxy-Secret": "s3cret", "X-RapidAPI-User": user, "X-RapidAPI-Subscription": plan}
+        return [(await client.get("/openapi.json", headers=headers)).status_code for _ in range(count)]
+
+    with patch("app.config.settings.rapidapi_proxy_secret", "s3cret"):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            alice = await statuses(client, "alice", "BASIC", 3)
+            bob = await statuses(client, "bob", "PRO", 5)
+            health = await client.get("/health", headers={"X-RapidAPI-Proxy-Secret": "s3cret", "X-RapidAPI-User": "alice"})
+
+    assert alice == [200, 200, 429]
+    assert bob == [200, 200, 200, 200, 429]
+    assert health.status_code == 200
@@ -0,0 +1,191 @@
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from httpx import ASGITransport, AsyncClient
+
+from app.main import app
+from app.routers import profile, repositories
+from app.services.github_api import GitHubAPIClient
+from app.services.prefetch import PrefetchQueue
+from app.services.profile_parsers import empty_profile_data
+from app.services.rendered import RenderedResponse
+from app.services.repo_index import RepoIndex
+from app.services.token_pool import TokenPool
+
+
+def token_pool(remaining: int, reset_in: float = 1) -> TokenPool:
+    pool = TokenPool(["token"])
+    budget = pool._budgets[0]
+    pool.update(budget, {"X-RateLimit-Remaining": str(remaining), "X-RateLimit-Reset": str(time.time() + reset_in)})
+    return pool
+
+
+async def wait_until(condition, timeout: float = 2) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_jobs_run_in_priority_order_and_survive_restart(tmp_path):
+    path = str(tmp_path / "prefetch.db")
+    ran = []
+
+    async def run(username: str) -> None:
+        if username == "ghost":
+            raise HTTPException(status_code=404, detail="not found")
+        ran.append(username)
+
+    queue = PrefetchQueue(app.state.loader, token_pool(5000), {"profile": run}, path=path, workers=1)
+    await queue.enqueue(["later", "ghost"], ["profile"], priority=5)
+    await queue.enqueue(["first"], ["profile"], priority=0)
+    await queue.close()
+
+    # A new process picks the stored jobs up; the lowest priority number runs first.
+    queue = PrefetchQueue(app.state.loader, token_pool(5000), {"profile": run}, path=path, workers=1)
+    queue.start()
+    await wait_until(lambda: queue.completed + queue.failed == 3)
+    await queue.close()
+
+    assert ran == ["first", "later"]
+    assert queue.stats()["failed"] == 1
+    queue = PrefetchQueue(app.state.loader, token_pool(5000), {"profile": run}, path=path)
+    assert queue._db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0] == 0
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_prefetch_is_paced_by_budget_and_yields_to_live_misses():
+    ran = []
+
+    async def run(username: str) -> None:
+        ran.append(username)
+
+    assert PrefetchQueue(app.state.loader, token_pool(0, reset_in=100), {}).budget_rate() == 0
+    # A spent budget whose window has passed counts as full again.
+    assert PrefetchQueue(app.state.loader, token_pool(0, reset_in=-1), {}).budget_rate() > 0
+
+    # 100 requests left for the next 100 seconds, half of them for prefetch: one job every 2s.
+    queue = PrefetchQueue(app.state.loader, token_pool(100, reset_in=100), {"profile": run}, workers=2)
+    assert queue.budget_rate() == pytest.approx(0.5, rel=0.05)
+    queue.start()
+    await queue.enqueue(["a", "b"], ["profile"])
+    await wait_until(lambda: ran == ["a"])
+    await asyncio.sleep(0.2)
+    assert ran == ["a"]
+    await queue.close()
+
+    queue = PrefetchQueue(app.state.loader, token_pool(5000), {"profile": run})
+    queue.start()
+    app.state.loader.live_misses = 1
+    await queue.enqueue(["c"], ["profile"])
+    await asyncio.sleep(0.2)
+    assert "c" not in ran
+    app.state.loader.live_misses = 0
+    await wait_until(lambda: "c" in ran)
+    assert queue.deferred == 1
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_jobs_are_charged_for_the_requests_they_make():
+    pool = token_pool(100, reset_in=100)
+
+    async def run(username: str) -> None:
+        for _ in range(5):
+            await pool.acquire()
+
+    queue = PrefetchQueue(app.state.loader, pool, {"repos": run})
+    queue.start()
+    await queue.enqueue(["a"], ["repos"])
+    await wait_until(lambda: queue.completed == 1)
+    await queue.close()
+
+    # 2 requests reserved at 0.5/s, then 3 more at the rate left once the job had spent 5.
+    assert queue._next_slot - time.monotonic() == pytest.approx(4 + 3 / (0.5 * 95 / 100), abs=0.5)
+
+
+@pytest.mark.asyncio
+async def test_prefetch_runners_cache_rendered_profile_and_repo_index():
+    def repo(i):
+        return {"name": f"repo-{i}", "full_name": f"testuser/repo-{i}", "html_url": f"https://github.com/testuser/repo-{i}"}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/users/testuser":
+            return httpx.Response(200, json={"login": "testuser", "public_repos": 250, "followers": 7})
+        page = int(request.url.params["page"])
+        return httpx.Response(200, json=[repo(i) for i in range((page - 1) * 100, min(page * 100, 250))])
+
+    pool = token_pool(5000, reset_in=3600)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="https://api.github.com") as client:
+        state = SimpleNamespace(
+            loader=app.state.loader,
+            github_api=GitHubAPIClient(client, token_pool=pool, base_url="https://api.github.com"),
+            github_scraper=app.state.github_scraper,
+            github_graphql=None,
+        )
+        queue = PrefetchQueue(
+            app.state.loader,
+            pool,
+            {
+                "profile": lambda username: profile.prefetch_profile(state, username),
+                "repos": lambda username: repositories.prefetch_repositories(state, username),
+            },
+        )
+        with patch(
+            "app.services.github_scraper.GitHubScraper.scrape_profile",
+            new_callable=AsyncMock,
+            return_value=empty_profile_data(),
+        ):
+            queue.start()
+            await queue.enqueue(["testuser"], ["profile", "repos"])
+            await wait_until(lambda: queue.completed == 2)
+            await queue.close()
+
+    rendered, stale = await app.state.cache.get_entry("profile:testuser")
+    assert isinstance(rendered, RenderedResponse) and not stale
+    assert rendered.model().followers == 7
+    index, _ = await app.state.cache.get_entry("repos:testuser:all")
+    assert isinstance(index, RepoIndex)
+    assert len(index.repositories) == 250
+    # One user lookup for the profile; three pages and a user lookup for the index.
+    assert pool.requests() == 5
+
+
+@pytest.mark.asyncio
+async def test_admin_prefetch_endpoint_queues_and_warms_the_cache():
+    async def run(username: str) -> None:
+        await app.state.cache.set(f"profile:{username}", {"username": username})
+
+    app.state.prefetch = PrefetchQueue(app.state.loader, token_pool(5000), {"profile": run, "repos": run})
+    app.state.prefetch.start()
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            with patch("app.routers.admin.settings.admin_token", "admin-secret"):
+                denied = await client.post("/admin/prefetch", json={"usernames": ["octocat"]})
+                invalid = await client.post(
+                    "/admin/prefetch", json={"usernames": ["../user"]}, headers={"X-Admin-Token": "admin-secret"}
+                )
+                queued = await client.post(
+                    "/admin/prefetch",
+                    json={"usernames": ["octocat", "torvalds", "octocat"], "kinds": ["profile"]},
+                    headers={"X-Admin-Token": "admin-secret"},
+                )
+                await wait_until(lambda: app.state.prefetch.completed == 2)
+                stats = await client.get("/admin/prefetch", headers={"X-Admin-Token": "admin-secret"})
+    finally:
+        await app.state.prefetch.close()
+
+    assert denied.status_code == 403
+    assert invalid.status_code == 422
+    assert queued.status_code == 202
+    assert queued.json() == {"queued": 2}
+    assert stats.json()["pending"] == 0
+    assert await app.state.cache.ttl_remaining("profile:torvalds") > 0
@@ -1,10 +1,19 @@
+import asyncio
+import json
 from unittest.mock import AsyncMock, patch
 
+import httpx
 import pytest
 from fastapi import HTTPException
 from httpx import ASGITransport, AsyncClient
 
+from app.config import settings
 from app.main import app
+from app.models.profile import GitHubProfile
+from app.services.cache_backends import decode, encode
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.github_scraper import GitHubScraper
+from app.services.loader import CacheLoader
 
 
 @pytest.fixture
@@ -66,3 +75,201 @@ async def test_profile_not_found():
 
         assert resp.status_code == 404
         assert "not found" in resp.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_profile_misses_are_coalesced(mock_github_user):
+    async def slow_get_user(username):
+        await asyncio.sleep(0.05)
+        return mock_github_user
+
+    with (
+        patch("app.services.github_api.GitHubAPIClient.get_user", new_callable=AsyncMock, side_effect=slow_get_user) as mock_api,
+        patch("app.services.github_scraper.GitHubScraper.scrape_profile", new_callable=AsyncMock) as mock_scraper,
+    ):
+        mock_scraper.return_value = {"pinned_repos": [], "contribution_stats": None, "achievements": []}
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            responses = await asyncio.gather(*(client.get("/profile/testuser") for _ in range(5)))
+
+        assert all(resp.status_code == 200 for resp in responses)
+        assert mock_api.await_count == 1
+        assert mock_scraper.await_count == 1
+        assert app.state.singleflight.coalesced == 4
+
+
+@pytest.mark.asyncio
+async def test_profiles_batch_reports_status_per_user(mock_github_user):
+    async def get_user(username):
+        if username == "ghost":
+            raise HTTPException(status_code=404, detail="GitHub user 'ghost' not found")
+        return mock_github_user | {"login": username}
+
+    with (
+        patch("app.services.github_api.GitHubAPIClient.get_user", new_callable=AsyncMock, side_effect=get_user) as mock_api,
+        patch("app.services.github_scraper.GitHubScraper.scrape_profile", new_callable=AsyncMock) as mock_scraper,
+    ):
+        mock_scraper.return_value = {"pinned_repos": [], "contribution_stats": None, "achievements": []}
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.get("/profile/cached")
+            resp = await client.post("/profiles", json={"usernames": ["cached", "alice", "ghost", "alice"]})
+
+        assert resp.status_code == 200
+        results = resp.json()["results"]
+        assert [(r["username"], r["status"]) for r in results] == [("cached", 200), ("alice", 200), ("ghost", 404)]
+        assert results[1]["profile"]["username"] == "alice"
+        assert "not found" in results[2]["error"]
+        assert mock_api.await_count == 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "usernames",
+    [["../user"], ["octocat", "a/b"], ["-leading"], ["x" * 40], [f"user{i}" for i in range(51)], []],
+)
+async def test_profiles_batch_rejects_invalid_usernames(usernames):
+    with patch("app.services.github_api.GitHubAPIClient.get_user", new_callable=AsyncMock) as mock_api:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            resp = await client.post("/profiles", json={"usernames": usernames})
+
+    assert resp.status_code == 422
+    mock_api.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_profiles_batch_ndjson_streams_one_result_per_line(mock_github_user):
+    async def get_user(username):
+        if username == "ghost":
+            raise HTTPException(status_code=404, detail="GitHub user 'ghost' not found")
+        return mock_github_user | {"login": username}
+
+    with (
+        patch("app.services.github_api.GitHubAPIClient.get_user", new_callable=AsyncMock, side_effect=get_user),
+        patch("app.services.github_scraper.GitHubScraper.scrape_profile", new_callable=AsyncMock) as mock_scraper,
+    ):
+        mock_scraper.return_value = {"pinned_repos": [], "contribution_stats": None, "achievements": []}
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            resp = await client.post(
+                "/profiles",
+                json={"usernames": ["alice", "ghost"]},
+                headers={"Accept": "application/x-ndjson"},
+            )
+            refused = await client.post(
+                "/profiles",
+                json={"usernames": ["alice"]},
+                headers={"Accept": "application/x-ndjson;q=0, application/json"},
+            )
+
+    assert resp.headers["content-type"] == "application/x-ndjson"
+    results = sorted((json.loads(line) for line in resp.text.splitlines()), key=lambda r: r["username"])
+    assert [(r["username"], r["status"]) for r in results] == [("alice", 200), ("ghost", 404)]
+    assert results[0]["profile"]["username"] == "alice"
+    assert refused.headers["content-type"] == "application/json"
+    assert refused.json()["results"][0]["status"] == 200
+
+
+@pytest.mark.asyncio
+async def test_cached_profile_is_served_as_rendered_bytes_with_etag(mock_github_user):
+    with (
+        patch("app.services.github_api.GitHubAPIClient.get_user", new_callable=AsyncMock) as mock_api,
+        patch("app.services.github_scraper.GitHubScraper.scrape_profile", new_callable=AsyncMock) as mock_scraper,
+    ):
+        mock_api.return_value = mock_github_user
+        mock_scraper.return_value = {"pinned_repos": [], "contribution_stats": None, "achievements": []}
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await client.get("/profile/testuser")
+            second = await client.get("/profile/testuser")
+
+    assert mock_api.await_count == 1
+    assert first.content == second.content
+    assert first.headers["etag"] == second.headers["etag"]
+    assert first.headers["etag"].startswith('"') and not first.headers["etag"].startswith("W/")
+    # Rendered straight from upstream data, yet byte-identical to the validated model.
+    assert first.content == GitHubProfile.model_validate_json(first.content).model_dump_json().encode()
+    assert GitHubProfile.model_validate_json(first.content).username == "testuser"
+
+    rendered, _ = await app.state.cache.get_entry("profile:testuser")
+    restored = decode(encode(rendered))
+    assert (restored.body, restored.etag, restored.model_type) == (rendered.body, rendered.etag, GitHubProfile)
+
+
+@pytest.mark.asyncio
+async def test_profile_conditional_get_and_compression(mock_github_user):
+    with (
+        patch("app.services.github_api.GitHubAPIClient.get_user", new_callable=AsyncMock) as mock_api,
+        patch("app.services.github_scraper.GitHubScraper.scrape_profile", new_callable=AsyncMock) as mock_scraper,
+        patch("app.services.rendered.settings.response_compress_min_bytes", 1),
+    ):
+        mock_api.return_value = mock_github_user
+        mock_scraper.return_value = {"pinned_repos": [], "contribution_stats": None, "achievements": []}
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            plain = await client.get("/profile/testuser", headers={"Accept-Encoding": "identity"})
+            gzipped = await client.get("/profile/testuser", headers={"Accept-Encoding": "gzip"})
+            not_modified = await client.get(
+                "/profile/testuser",
+                headers={"Accept-Encoding": "gzip", "If-None-Match": gzipped.headers["etag"]},
+            )
+
+    assert mock_api.await_count == 1
+    assert "content-encoding" not in plain.headers
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.content == plain.content
+    assert gzipped.headers["etag"] != plain.headers["etag"]
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    max_age = int(plain.headers["cache-control"].split("max-age=")[1].split(",")[0])
+    assert 0 < max_age <= 300
+
+
+@pytest.mark.asyncio
+async def test_unknown_user_404_is_cached_briefly():
+    app.state.loader = CacheLoader(app.state.cache, app.state.singleflight, not_found_ttl=60)
+    with patch(
+        "app.services.github_api.GitHubAPIClient.get_user",
+        new_callable=AsyncMock,
+        side_effect=HTTPException(status_code=404, detail="GitHub user 'ghost' not found"),
+    ) as mock_api:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await client.get("/profile/ghost")
+            second = await client.get("/profile/ghost")
+
+    assert first.status_code == second.status_code == 404
+    assert second.json() == first.json()
+    assert mock_api.await_count == 1
+    assert 0 < await app.state.cache.ttl_remaining("profile:ghost") <= 60
+    assert app.state.loader.negative_hits == 1
+
+
+@pytest.mark.asyncio
+async def test_profile_degrades_to_api_data_when_scraping_fails(mock_github_user):
+    web_client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(503)))
+    app.state.github_scraper = GitHubScraper(web_client, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60))
+    with patch("app.services.github_api.GitHubAPIClient.get_user", new_callable=AsyncMock) as mock_api:
+        mock_api.return_value = mock_github_user
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            resp = await client.get("/profile/testuser")
+            # The breaker is open now: the next profile skips github.com entirely.
+            other = await client.get("/profile/otheruser")
+
+    assert resp.status_code == other.status_code == 200
+    assert resp.json()["followers"] == 100
+    assert resp.json()["pinned_repos"] == []
+    assert await app.state.cache.ttl_remaining("profile:testuser") <= settings.cache_degraded_ttl
+    max_age = int(resp.headers["Cache-Control"].split("max-age=")[1].split(",")[0])
+    assert max_age <= settings.cache_degraded_ttl
+    assert app.state.github_scraper.breaker.stats()["rejected"] == 1
+    assert app.state.github_scraper.stats()["degraded"] == 2
+    await web_client.aclose()
@@ -1,9 +1,13 @@
+import json
 from unittest.mock import AsyncMock, patch
 
 import pytest
+from fastapi import Request
 from httpx import ASGITransport, AsyncClient
 
 from app.main import app
+from app.models.repository import GitHubRepository, RepositoriesResponse
+from app.services.ndjson import wants_ndjson
 
 
 @pytest.fixture
@@ -64,3 +68,136 @@ async def test_repos_pagination_params():
         assert data["page"] == 2
         assert data["per_page"] == 5
         assert data["repositories"] == []
+
+
+@pytest.mark.asyncio
+async def test_repos_ndjson_stream(mock_repos):
+    with patch(
+        "app.services.github_api.GitHubAPIClient.get_repos",
+        new_callable=AsyncMock,
+        return_value=mock_repos * 2,
+    ):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            resp = await client.get("/repos/testuser", headers={"Accept": "application/x-ndjson"})
+
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in resp.text.splitlines()]
+        assert [line["name"] for line in lines] == ["my-project", "my-project"]
+
+
+@pytest.mark.asyncio
+async def test_repos_fetch_all_then_sort_and_page_locally(mock_repos):
+    def repo(i):
+        return mock_repos[0] | {"name": f"repo-{i}", "full_name": f"testuser/repo-{i}", "stargazers_count": i}
+
+    async def get_repos(username, page, per_page, sort):
+        return [repo(i) for i in range((page - 1) * 100, min(page * 100, 250))]
+
+    with (
+        patch("app.services.github_api.GitHubAPIClient.get_repos", new_callable=AsyncMock, side_effect=get_repos) as mock_get_repos,
+        patch("app.services.github_api.GitHubAPIClient.get_user", new_callable=AsyncMock, return_value={"public_repos": 250}),
+    ):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await client.get("/repos/testuser?all=true&sort=stars&per_page=10")
+            third = await client.get("/repos/testuser?all=true&sort=stars&per_page=100&page=3")
+
+        assert [r["stars"] for r in first.json()["repositories"]] == list(range(249, 239, -1))
+        assert third.json()["total_count"] == 50
+        assert mock_get_repos.await_count == 3
+        # One lookup per request: a miss for the cold index, then a hit.
+        cache_stats = app.state.cache.stats()
+        assert (cache_stats["misses"], cache_stats["hits"]) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_repo_filters_and_stats_use_cached_dataset(mock_repos):
+    repos = [
+        mock_repos[0] | {"name": "a", "full_name": "testuser/a", "language": "Python", "stargazers_count": 5, "topics": ["api"]},
+        mock_repos[0] | {"name": "b", "full_name": "testuser/b", "language": "Go", "stargazers_count": 50, "fork": True, "topics": []},
+        mock_repos[0] | {"name": "c", "full_name": "testuser/c", "language": "python", "stargazers_count": 7, "archived": True, "topics": ["API"]},
+    ]
+    with patch(
+        "app.services.github_api.GitHubAPIClient.get_repos",
+        new_callable=AsyncMock,
+        return_value=repos,
+    ) as mock_get_repos:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            python_repos = await client.get("/repos/testuser?language=PYTHON&sort=stars")
+            non_forks = await client.get("/repos/testuser?fork=false&topic=API")
+            plain_page = await client.get("/repos/testuser?sort=full_name&per_page=2")
+            stats = await client.get("/repos/testuser/stats")
+
+        assert [r["name"] for r in python_repos.json()["repositories"]] == ["c", "a"]
+        assert sorted(r["name"] for r in non_forks.json()["repositories"]) == ["a", "c"]
+        assert [r["name"] for r in plain_page.json()["repositories"]] == ["c", "b"]
+        data = stats.json()
+        assert data["total_repositories"] == 3
+        assert data["total_stars"] == 62
+        assert data["forked_repositories"] == 1
+        assert data["languages"][0] == {"language": "Go", "repositories": 1, "stars": 50, "forks": 5}
+        assert data["topics"] == [{"topic": "api", "repositories": 2}]
+        assert mock_get_repos.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_repos_fast_path_renders_same_bytes_as_models(mock_repos):
+    sparse = {
+        "name": "naïve-ñ",
+        "full_name": "testuser/naïve-ñ",
+        "description": None,
+        "html_url": "https://github.com/testuser/naive",
+        "owner": {"login": "testuser"},
+    }
+    with patch(
+        "app.services.github_api.GitHubAPIClient.get_repos",
+        new_callable=AsyncMock,
+        return_value=mock_repos + [sparse],
+    ):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            resp = await client.get("/repos/testuser?per_page=10")
+
+    expected = RepositoriesResponse(
+        username="testuser",
+        total_count=2,
+        page=1,
+        per_page=10,
+        repositories=[
+            GitHubRepository(
+                name="my-project",
+                full_name="testuser/my-project",
+                description="A test project",
+                html_url="https://github.com/testuser/my-project",
+                language="Python",
+                topics=["api", "fastapi"],
+                stars=42,
+                forks=5,
+                watchers=42,
+                open_issues=3,
+                created_at="2023-01-01T00:00:00Z",
+                updated_at="2024-06-01T00:00:00Z",
+                pushed_at="2024-06-01T00:00:00Z",
+            ),
+            GitHubRepository(name="naïve-ñ", full_name="testuser/naïve-ñ", html_url="https://github.com/testuser/naive"),
+        ],
+    )
+    assert resp.content == expected.model_dump_json().encode()
+
+
+@pytest.mark.parametrize(
+    ("accept", "expected"),
+    [
+        ("application/x-ndjson", True),
+        ("application/json, application/x-ndjson", True),
+        ("application/x-ndjson;q=0", False),
+        ("application/json, application/x-ndjson;q=0.5", False),
+        ("*/*", False),
+    ],
+)
+def test_wants_ndjson_honours_quality(accept, expected):
+    request = Request({"type": "http", "headers": [(b"accept", accept.encode())]})
+    assert wants_ndjson(request) is expected
@@ -0,0 +1,113 @@
+import asyncio
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from app.services.github_scraper import GitHubScraper
+from app.services.parse_executor import ParseExecutor, ParseQueueFull
+from app.services.profile_parsers import LxmlProfileParser, SoupProfileParser
+
+PROFILE_HTML = (Path(__file__).parent / "fixtures" / "profile.html").read_bytes()
+
+
+def test_soup_parser_extracts_profile_sections():
+    data = SoupProfileParser().parse(PROFILE_HTML)
+
+    assert [repo["name"] for repo in data["pinned_repos"]] == ["Hello-World", "Spoon-Knife", "linguist"]
+    assert data["pinned_repos"][0] == {
+        "name": "Hello-World",
+        "description": "My first repository on GitHub!& more",
+        "language": "Python",
+        "stars": 2617,
+    }
+    assert data["contribution_stats"] == {"total_contributions_last_year": 1234}
+    assert data["achievements"] == ["Pull Shark", "Starstruck"]
+
+
+@pytest.mark.parametrize(
+    "html",
+    [PROFILE_HTML, PROFILE_HTML.decode(), b"", b"<html><body></body></html>"],
+    ids=["bytes", "str", "empty", "blank-page"],
+)
+def test_lxml_parser_matches_soup_parser(html):
+    assert LxmlProfileParser().parse(html) == SoupProfileParser().parse(html)
+
+
+@pytest.mark.asyncio
+async def test_thread_executor_parses_off_loop_and_bounds_queue():
+    executor = ParseExecutor("thread", "lxml", max_workers=1, max_queue=1)
+    try:
+        results = await asyncio.gather(
+            *(executor.parse(PROFILE_HTML) for _ in range(3)),
+            return_exceptions=True,
+        )
+    finally:
+        executor.shutdown()
+
+    assert [type(result) for result in results].count(ParseQueueFull) == 1
+    assert results[0]["contribution_stats"] == {"total_contributions_last_year": 1234}
+    assert executor.stats()["completed"] == 2
+    assert executor.stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_scraper_stops_download_after_needed_sections():
+    tail_chunks_sent = 0
+
+    async def page():
+        nonlocal tail_chunks_sent
+        for start in range(0, len(PROFILE_HTML), 512):
+            yield PROFILE_HTML[start : start + 512]
+        while True:
+            tail_chunks_sent += 1
+            yield b"<div>activity</div>" * 100
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=page())
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        scraper = GitHubScraper(client)
+        data = await scraper.scrape_profile("octocat")
+
+    assert data["contribution_stats"] == {"total_contributions_last_year": 1234}
+    assert len(data["pinned_repos"]) == 3
+    assert scraper.stats()["stopped_early"] == 1
+    assert tail_chunks_sent <= 1
+
+
+@pytest.mark.asyncio
+async def test_parser_errors_are_counted_apart_from_outages():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=PROFILE_HTML)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        scraper = GitHubScraper(client)
+        with patch.object(scraper._executor, "parse", new_callable=AsyncMock, side_effect=ValueError("bad markup")):
+            data = await scraper.scrape_profile("octocat")
+
+    assert "degraded" not in data
+    assert data["pinned_repos"] == []
+    assert scraper.stats()["parse_errors"] == 1
+    assert scraper.stats()["degraded"] == 0
+    assert scraper.breaker.stats()["open"] == 0
+
+
+@pytest.mark.asyncio
+async def test_full_parse_queue_degrades_instead_of_counting_a_parse_error():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=PROFILE_HTML)
+
+    executor = ParseExecutor("thread", "lxml", max_workers=1, max_queue=0)
+    try:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            scraper = GitHubScraper(client, executor=executor)
+            results = await asyncio.gather(*(scraper.scrape_profile(f"user{i}") for i in range(4)))
+    finally:
+        executor.shutdown()
+
+    shed = [result for result in results if result.get("degraded")]
+    assert shed and len(shed) == executor.stats()["rejected"]
+    assert scraper.stats()["degraded"] == len(shed)
+    assert scraper.stats()["parse_errors"] == 0